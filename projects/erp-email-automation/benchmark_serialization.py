@@ -0,0 +1,120 @@
+# /// script
+# requires-python = "==3.11.*"
+# dependencies = [
+#   "codewords-client==0.4.0",
+#   "fastapi==0.116.1",
+#   "pydantic==2.10.5",
+#   "email-validator==2.2.0",
+#   "langchain==0.3.20",
+#   "langchain-anthropic==0.3.10",
+#   "langchain-openai==0.2.14",
+#   "httpx==0.28.1",
+#   "zstandard==0.23.0",
+# ]
+# ///
+
+"""
+📏 WorkflowResponse serialization benchmark
+
+Compares the default FastAPI response path (response_model validation +
+jsonable dict + json.dumps) against the fast path used by the service
+(pydantic-core JSON bytes), with projection, pagination and compression,
+for a run with 10,000 campaign results.
+
+Usage: uv run benchmark_serialization.py [result_count]
+"""
+
+import json
+import sys
+import time
+import gzip
+
+import zstandard
+from fastapi.encoders import jsonable_encoder
+
+from erp_intelligence_email_marketing import (
+    AnalyticsReport,
+    CampaignResult,
+    WorkflowRequest,
+    WorkflowResponse,
+    render_workflow_response,
+)
+
+SEGMENTS = ["VIP", "Growth", "At-Risk", "Churned", "New", "Default"]
+REPEATS = 5
+
+
+def build_response(result_count: int) -> WorkflowResponse:
+    """Synthetic WorkflowResponse shaped like a large production run"""
+    results = [
+        CampaignResult(
+            customer_id=f"CUST-{i:05d}",
+            email=f"customer{i+1}@techcorp.com",
+            segment=SEGMENTS[i % len(SEGMENTS)],
+            sent=True,
+            gmail_id=f"demo_gmail_id_{i:012x}",
+            crm_logged=True,
+        )
+        for i in range(result_count)
+    ]
+    body = "Dear Customer 1 Corp,\n\n" + "We truly value your business. " * 40
+    return WorkflowResponse(
+        execution_summary=f"Processed {result_count} high-value customers",
+        workflow_metrics={"campaigns_generated": result_count, "delivery_success_rate": "100.0%"},
+        campaign_results=results,
+        analytics=AnalyticsReport(
+            total_processed=result_count, segments={s: result_count // 6 for s in SEGMENTS},
+            emails_sent=result_count, high_value_count=result_count // 3, estimated_roi="1234.5%"
+        ),
+        langchain_memory={"campaign_history": [{"type": "ai", "content": body}] * 20},
+        sample_preview={"campaign": {"body_text": body, "variant_a": {"body": body}, "variant_b": {"body": body}}},
+    )
+
+
+def timed(fn) -> tuple[bytes, float]:
+    """Best-of-N wall time in milliseconds"""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return out, best * 1000
+
+
+def main(result_count: int = 10_000):
+    response = build_response(result_count)
+    raw = response.model_dump()
+
+    def fastapi_default() -> bytes:
+        validated = WorkflowResponse.model_validate(raw)
+        return json.dumps(
+            jsonable_encoder(validated), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()
+
+    def fast_path(accept_encoding: str = "", **options) -> bytes:
+        return render_workflow_response(response, WorkflowRequest(**options), accept_encoding).body
+
+    cases = [
+        ("fastapi default", fastapi_default),
+        ("fast path", fast_path),
+        ("fast + gzip", lambda: fast_path("gzip")),
+        ("fast + zstd", lambda: fast_path("zstd")),
+        ("fast + summary projection", lambda: fast_path(include_sections=["analytics", "workflow_metrics"])),
+        ("fast + page_size=100", lambda: fast_path(page_size=100)),
+        ("fast + page_size=100 + zstd", lambda: fast_path("zstd", page_size=100)),
+    ]
+
+    print(f"WorkflowResponse with {result_count:,} campaign results (best of {REPEATS})")
+    print(f"{'path':<30}{'bytes':>12}{'encode ms':>12}")
+    for name, fn in cases:
+        body, ms = timed(fn)
+        print(f"{name:<30}{len(body):>12,}{ms:>12.2f}")
+
+    # Sanity check: compressed bodies round-trip to the uncompressed fast path
+    plain = fast_path()
+    assert gzip.decompress(fast_path("gzip")) == plain
+    assert zstandard.ZstdDecompressor().decompress(fast_path("zstd")) == plain
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
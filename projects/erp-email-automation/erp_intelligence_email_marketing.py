@@ -9,6 +9,7 @@
 #   "langchain-anthropic==0.3.10",
 #   "langchain-openai==0.2.14",
 #   "httpx==0.28.1",
+#   "zstandard==0.23.0",
 # ]
 # [tool.env-checker]
 # env_vars = [
@@ -16,6 +17,7 @@
 #   "LOGLEVEL=INFO",
 #   "CODEWORDS_API_KEY",
 #   "CODEWORDS_RUNTIME_URI",
+#   "CUSTOMER_STORE_PATH=customer_master.db",
 # ]
 # ///
 
@@ -46,22 +48,35 @@ Architecture:
 - 15-20% ↑ conversion rates (targeted segments)
 """
 
-from typing import Literal, Any
+from typing import Literal, Any, Callable, get_args
 from datetime import datetime, timedelta
 from decimal import Decimal
-from collections import defaultdict
+from collections import defaultdict, OrderedDict, deque
+from contextlib import asynccontextmanager
 import random
+import time
 import hashlib
 import asyncio
-
+import os
+import sqlite3
+import threading
+import base64
+import gzip
+import uuid
+import weakref
+from bisect import bisect_left, bisect_right
+
+import zstandard
 from codewords_client import logger, run_service, AsyncCodewordsClient, redis_client
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field, EmailStr
 
 # LangChain imports for advanced memory & reasoning
 from langchain.memory import ConversationBufferMemory
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 # from langchain_google_genai import ChatGoogleGenerativeAI  # Deprecated - skip for now
@@ -96,14 +111,26 @@ class CustomerMetrics(BaseModel):
     language: str = "en"
 
 
+SegmentName = Literal["VIP", "Growth", "At-Risk", "Churned", "New", "Default"]
+EmailTemplateName = Literal["winback", "premium", "onboarding"]
+
+
 class CustomerSegment(BaseModel):
     """AI-determined customer segment with reasoning"""
-    segment: Literal["VIP", "Growth", "At-Risk", "Churned", "New", "Default"]
+    segment: SegmentName
     confidence: float
     reasoning: str
     recommended_products: list[str]
 
 
+class CustomerCluster(BaseModel):
+    """Group of customers with near-identical features, profiled once"""
+    cluster_id: str
+    key: dict[str, Any]
+    centroid: CustomerMetrics
+    members: list[CustomerMetrics]
+
+
 class EmailCampaign(BaseModel):
     """Generated email campaign with A/B variants"""
     subject_lines: list[str]
@@ -132,6 +159,20 @@ class AnalyticsReport(BaseModel):
     estimated_roi: str
 
 
+ResponseSection = Literal["workflow_metrics", "campaign_results", "analytics", "langchain_memory", "sample_preview"]
+
+
+class CompletionInfo(BaseModel):
+    """How much of the planned work finished within the request's time budget"""
+    status: Literal["complete", "partial"]
+    customers_planned: int
+    customers_completed: int
+    skipped_customer_ids: list[str] = []
+    stopped_reason: str | None = None
+    deadline_ms: int | None = None
+    elapsed_ms: int
+
+
 class WorkflowRequest(BaseModel):
     """Workflow execution request"""
     mode: Literal["test_sample", "full_run"] = Field(
@@ -155,6 +196,24 @@ class WorkflowRequest(BaseModel):
         default=False,
         description="Send Slack notifications"
     )
+    include_sections: list[ResponseSection] | None = Field(
+        default=None,
+        description="Response sections to return (default: all, [] for the summary only)"
+    )
+    deadline_ms: int | None = Field(
+        default=None,
+        description="Time budget - highest-priority customers first, partial results at the deadline",
+        ge=100, le=600000
+    )
+    cluster_profiles: bool = Field(
+        default=False,
+        description="One AI profile per customer cluster instead of per customer"
+    )
+    page_size: int | None = Field(
+        default=None,
+        description="Paginate campaign_results - further pages (same size) via GET /campaign_results",
+        ge=1, le=10000
+    )
 
 
 class WorkflowResponse(BaseModel):
@@ -165,6 +224,81 @@ class WorkflowResponse(BaseModel):
     analytics: AnalyticsReport
     langchain_memory: dict[str, Any]
     sample_preview: dict[str, Any]
+    completion: CompletionInfo | None = None
+    run_id: str | None = None
+    next_cursor: str | None = None
+
+
+class CampaignDefinition(BaseModel):
+    """One campaign variant - its own selection, routing, content and delivery settings"""
+    name: str = "default"
+    min_total_spend: Decimal = Field(
+        default=Decimal("10000.00"),
+        description="Spend threshold (the shared ETL already keeps >= $10K)",
+        ge=Decimal("10000.00")
+    )
+    include_segments: list[SegmentName] | None = Field(
+        default=None,
+        description="Only target these segments (default: all)"
+    )
+    route_overrides: dict[SegmentName, str] = Field(
+        default_factory=dict,
+        description="Segment → campaign path, replacing the default routing"
+    )
+    template_id: EmailTemplateName | None = Field(
+        default=None,
+        description="Email template (subject, body, CTA) for every customer instead of the segment default"
+    )
+    max_customers: int = Field(default=10, ge=1, le=1000)
+    enable_email: bool = False
+    enable_crm: bool = False
+
+
+class CampaignReport(BaseModel):
+    """Per-campaign outcome of a downstream pass"""
+    name: str
+    analytics: AnalyticsReport
+    campaign_results: list[CampaignResult]
+    routing_paths: dict[str, int]
+    completion: CompletionInfo
+    sample_preview: dict[str, Any] = {}
+
+
+class MultiCampaignRequest(BaseModel):
+    """N campaign variants fanned out over a single ETL pass"""
+    mode: Literal["test_sample", "full_run"] = Field(
+        default="test_sample",
+        description="test_sample: 5 customers, full_run: configurable count"
+    )
+    customer_count: int = Field(
+        default=100,
+        description="Customers to process (full_run mode only)",
+        ge=10, le=1000
+    )
+    deadline_ms: int | None = Field(
+        default=None,
+        description="Time budget shared by all campaigns",
+        ge=100, le=600000
+    )
+    cluster_profiles: bool = Field(
+        default=False,
+        description="One AI profile per customer cluster instead of per customer"
+    )
+    campaigns: list[CampaignDefinition] = Field(min_length=1, max_length=20)
+
+
+class MultiCampaignResponse(BaseModel):
+    """Shared ETL metrics plus one report per campaign"""
+    execution_summary: str
+    workflow_metrics: dict[str, Any]
+    campaigns: list[CampaignReport]
+
+
+class CampaignResultsPage(BaseModel):
+    """One cursor page of a run's campaign results"""
+    run_id: str
+    campaign_results: list[CampaignResult]
+    next_cursor: str | None = None
 
 
 # ==================================================================================
@@ -236,41 +370,204 @@ def generate_mock_erp_orders(customer_count: int) -> list[ERPOrder]:
     return orders
 
 
-def generate_mock_customer_database(customer_count: int) -> list[dict[str, Any]]:
+CUSTOMER_DOMAINS = ["techcorp.com", "businessltd.co.uk", "enterprise.de", "solutions.fr", "global.jp"]
+CUSTOMER_LANGUAGES = ["en", "de", "fr", "es", "ja"]
+
+
+def _mock_customer_record(index: int, updated_at: datetime) -> dict[str, Any]:
+    """Single customer master row - seeded per customer so it is stable across fetches"""
+    customer_id = f"CUST-{index:05d}"
+    rng = random.Random(customer_id)
+    return {
+        "customer_id": customer_id,
+        "email": f"customer{index+1}@{rng.choice(CUSTOMER_DOMAINS)}",
+        "language": rng.choice(CUSTOMER_LANGUAGES),
+        "industry": rng.choice(["Technology", "Manufacturing", "Retail", "Healthcare", "Finance"]),
+        "company_size": rng.choice(["SMB", "Mid-Market", "Enterprise"]),
+        "signup_date": (datetime.now() - timedelta(days=rng.randint(30, 730))).isoformat(),
+        "updated_at": updated_at.isoformat(),
+    }
+
+
+def generate_mock_customer_database(customer_count: int, updated_since: datetime | None = None) -> list[dict[str, Any]]:
     """
     NODE 2: Customer Database Layer - Demonstrates Google Sheets API structure
     
     This demo service simulates customer master data for portfolio showcase.
     Architecture is production-ready - data layer can be swapped with Sheets API.
+    
+    Without `updated_since` the full master is returned (initial snapshot).
+    With it, only rows modified after the marker are returned (delta fetch),
+    which the demo simulates by editing a small random slice of customers.
     """
     logger.info("STEPLOG START node2_fetch_customer_db")
-    logger.info("Fetching customer database (demo mode)", count=customer_count)
+    logger.info("Fetching customer database (demo mode)", count=customer_count,
+                updated_since=updated_since.isoformat() if updated_since else None)
     
-    domains = ["techcorp.com", "businessltd.co.uk", "enterprise.de", "solutions.fr", "global.jp"]
-    languages = ["en", "de", "fr", "es", "ja"]
+    now = datetime.now()
+    if updated_since is None:
+        return [_mock_customer_record(i, now) for i in range(customer_count)]
     
+    # Demo: ~2% of the master was edited since the last sync
+    edited = random.sample(range(customer_count), k=min(customer_count, max(1, customer_count // 50)))
     customers = []
-    for i in range(customer_count):
-        domain = random.choice(domains)
-        lang = random.choice(languages)
-        
-        customers.append({
-            "customer_id": f"CUST-{i:05d}",
-            "email": f"customer{i+1}@{domain}",
-            "language": lang,
-            "industry": random.choice(["Technology", "Manufacturing", "Retail", "Healthcare", "Finance"]),
-            "company_size": random.choice(["SMB", "Mid-Market", "Enterprise"]),
-            "signup_date": (datetime.now() - timedelta(days=random.randint(30, 730))).isoformat(),
-        })
+    for i in edited:
+        record = _mock_customer_record(i, now)
+        record["language"] = random.choice(CUSTOMER_LANGUAGES)
+        customers.append(record)
     
     return customers
 
 
+def fetch_customer_records(customer_ids: list[str]) -> list[dict[str, Any]]:
+    """
+    NODE 2: Customer Database Layer - point fetch by customer ID
+    
+    Used by the customer store to read through rows that no sync has
+    delivered yet (e.g. customers created after the last snapshot).
+    """
+    logger.info("Fetching customer records by ID (demo mode)", count=len(customer_ids))
+    now = datetime.now()
+    return [_mock_customer_record(int(cid.rsplit("-", 1)[1]), now) for cid in customer_ids]
+
+
+class CustomerMasterStore:
+    """
+    Local indexed customer master (SQLite), synced from the source by deltas.
+    
+    Replaces the per-run full reload of the customer database:
+    - customer_id primary key → indexed lookups for the ETL join
+    - updated_at high-water mark → updated-since delta sync
+    - Read-through point fetch for customers not yet synced
+    
+    Startup and per-run join cost depend on the delta and on the customers
+    actually joined, not on the total size of the customer master.
+    """
+    
+    LOOKUP_CHUNK_SIZE = 500  # Stay well below SQLite's bound-parameter limit
+    
+    def __init__(self, path: str):
+        self.path = path
+        # One connection shared by the server's threads (the event loop, worker
+        # threads, asyncio.to_thread) - the lock keeps every statement and
+        # transaction on it serialized
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS customers (
+                customer_id TEXT PRIMARY KEY,
+                email TEXT NOT NULL,
+                language TEXT NOT NULL,
+                industry TEXT,
+                company_size TEXT,
+                signup_date TEXT,
+                updated_at TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_customers_updated_at ON customers(updated_at);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                source TEXT PRIMARY KEY,
+                updated_since TEXT NOT NULL
+            );
+        """)
+        logger.info("Customer store opened", path=path)
+    
+    def get_sync_marker(self, source: str = "customer_db") -> datetime | None:
+        """Return the updated-since marker of the last successful sync"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT updated_since FROM sync_state WHERE source = ?", (source,)
+            ).fetchone()
+        return datetime.fromisoformat(row["updated_since"]) if row else None
+    
+    def upsert(self, records: list[dict[str, Any]]) -> int:
+        """Insert or update master rows, keeping the most recent version of each"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO customers (customer_id, email, language, industry, company_size, signup_date, updated_at)
+                VALUES (:customer_id, :email, :language, :industry, :company_size, :signup_date, :updated_at)
+                ON CONFLICT(customer_id) DO UPDATE SET
+                    email = excluded.email,
+                    language = excluded.language,
+                    industry = excluded.industry,
+                    company_size = excluded.company_size,
+                    signup_date = excluded.signup_date,
+                    updated_at = excluded.updated_at
+                WHERE excluded.updated_at >= customers.updated_at
+                """,
+                records,
+            )
+        return len(records)
+    
+    def sync(self, customer_count: int, source: str = "customer_db") -> int:
+        """
+        Pull changes from the customer source since the stored marker.
+        
+        The first sync takes a full snapshot; later syncs only fetch rows
+        updated after the marker. The new marker is the newest `updated_at`
+        received, so the source clock (not ours) decides what is a delta.
+        """
+        marker = self.get_sync_marker(source)
+        records = generate_mock_customer_database(customer_count, updated_since=marker)
+        if not records:
+            return 0
+        
+        self.upsert(records)
+        new_marker = max(r["updated_at"] for r in records)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO sync_state (source, updated_since) VALUES (?, ?) "
+                "ON CONFLICT(source) DO UPDATE SET updated_since = excluded.updated_since",
+                (source, new_marker),
+            )
+        logger.info("Customer store synced", delta_rows=len(records), full_snapshot=marker is None)
+        return len(records)
+    
+    def lookup(self, customer_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Indexed lookup of master rows by customer ID, reading through misses"""
+        found: dict[str, dict[str, Any]] = {}
+        for start in range(0, len(customer_ids), self.LOOKUP_CHUNK_SIZE):
+            chunk = customer_ids[start:start + self.LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT * FROM customers WHERE customer_id IN ({placeholders})", chunk
+                ).fetchall()
+            found.update({row["customer_id"]: dict(row) for row in rows})
+        
+        missing = [cid for cid in customer_ids if cid not in found]
+        if missing:
+            records = fetch_customer_records(missing)
+            self.upsert(records)
+            found.update({r["customer_id"]: r for r in records})
+        
+        return found
+    
+    def count(self) -> int:
+        """Number of customers held locally"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+
+_customer_store: CustomerMasterStore | None = None
+
+
+def get_customer_store() -> CustomerMasterStore:
+    """Process-wide customer store, opened on first use"""
+    global _customer_store
+    if _customer_store is None:
+        _customer_store = CustomerMasterStore(os.environ.get("CUSTOMER_STORE_PATH", "customer_master.db"))
+    return _customer_store
+
+
 # ==================================================================================
 # LAYER 2: DATA PROCESSING PIPELINE (Nodes 3-10)
 # ==================================================================================
 
-def process_and_aggregate_orders(orders: list[ERPOrder], customers_db: list[dict]) -> list[CustomerMetrics]:
+def process_and_aggregate_orders(orders: list[ERPOrder], customer_store: CustomerMasterStore) -> list[CustomerMetrics]:
     """
     NODES 3-10: Complete ETL Pipeline
     
@@ -283,6 +580,9 @@ def process_and_aggregate_orders(orders: list[ERPOrder], customers_db: list[dict
     - Remove Duplicates
     - Format for AI Processing
     - Split into Batches
+    
+    Customer master fields are joined via indexed lookups on the local
+    customer store, only for customers that pass the high-value filter.
     """
     logger.info("STEPLOG START node3_parse_json")
     logger.info("STEPLOG START node4_transform_data")
@@ -294,10 +594,6 @@ def process_and_aggregate_orders(orders: list[ERPOrder], customers_db: list[dict
     logger.info("STEPLOG START node10_split_batches")
     logger.info("Starting data processing pipeline", total_orders=len(orders))
     
-    # Create customer email lookup
-    email_map = {c["customer_id"]: c["email"] for c in customers_db}
-    lang_map = {c["customer_id"]: c["language"] for c in customers_db}
-    
     # Aggregate orders by customer
     customer_aggregates = defaultdict(lambda: {
         "orders": [],
@@ -311,6 +607,13 @@ def process_and_aggregate_orders(orders: list[ERPOrder], customers_db: list[dict
             customer_aggregates[order.customer_id]["total_spend"] += order.total_amount
             customer_aggregates[order.customer_id]["completed_orders"] += 1
     
+    # Indexed join against the customer master (high-value customers only)
+    high_value_ids = [
+        cust_id for cust_id, data in customer_aggregates.items()
+        if data["total_spend"] >= Decimal("10000.00")
+    ]
+    customer_lookup = customer_store.lookup(high_value_ids)
+    
     # Calculate metrics and filter
     metrics = []
     for cust_id, data in customer_aggregates.items():
@@ -330,14 +633,14 @@ def process_and_aggregate_orders(orders: list[ERPOrder], customers_db: list[dict
             metrics.append(CustomerMetrics(
                 customer_id=cust_id,
                 customer_name=last_order.customer_name,
-                email=email_map.get(cust_id, f"customer@example.com"),
+                email=customer_lookup.get(cust_id, {}).get("email", "customer@example.com"),
                 total_spend=data["total_spend"],
                 order_count=data["completed_orders"],
                 avg_order_value=data["total_spend"] / data["completed_orders"],
                 last_purchase_date=last_order.order_date,
                 days_since_purchase=days_since,
                 purchase_frequency=round(freq, 2),
-                language=lang_map.get(cust_id, "en")
+                language=customer_lookup.get(cust_id, {}).get("language", "en")
             ))
     
     logger.info("Data processing complete", 
@@ -347,27 +650,578 @@ def process_and_aggregate_orders(orders: list[ERPOrder], customers_db: list[dict
     return metrics
 
 
+# ==================================================================================
+# LAYER 2b: CUSTOMER CLUSTERING (optional, between processing and AI analysis)
+# ==================================================================================
+
+# Band edges line up with the segmentation and profile thresholds, so every
+# member of a cluster gets the same segment-relevant labels as its centroid.
+# Spend and recency thresholds are `>=` / `<` (edge value goes to the upper
+# band, bisect_right); frequency thresholds are `> 1.0` (edge value stays in
+# the lower band, bisect_left).
+SPEND_BAND_EDGES = [Decimal("15000"), Decimal("25000"), Decimal("50000"), Decimal("100000")]
+RECENCY_BAND_EDGES = [30, 60, 90]  # days since purchase
+FREQUENCY_BAND_EDGES = [0.5, 1.0, 2.0]  # orders per month
+
+PROFILE_PLACEHOLDERS = ["customer_name", "customer_id", "total_spend", "order_count", "purchase_frequency", "days_since_purchase"]
+
+
+def cluster_customers(customers: list[CustomerMetrics]) -> list[CustomerCluster]:
+    """
+    NODE 10b: Customer Clustering (grid bucketing)
+    
+    Buckets customers by spend band, recency band, frequency band and
+    language, and builds a mean-feature centroid per bucket. LLM profiling
+    then runs once per cluster: O(clusters) calls instead of O(customers).
+    """
+    logger.info("STEPLOG START node10b_cluster_customers")
+    
+    buckets: dict[tuple, list[CustomerMetrics]] = defaultdict(list)
+    for customer in customers:
+        buckets[(
+            bisect_right(SPEND_BAND_EDGES, customer.total_spend),
+            bisect_right(RECENCY_BAND_EDGES, customer.days_since_purchase),
+            bisect_left(FREQUENCY_BAND_EDGES, customer.purchase_frequency),
+            customer.language,
+        )].append(customer)
+    
+    clusters = []
+    for n, ((spend_band, recency_band, frequency_band, language), members) in enumerate(buckets.items()):
+        size = len(members)
+        total_spend = sum(m.total_spend for m in members) / size
+        order_count = round(sum(m.order_count for m in members) / size)
+        days_since = round(sum(m.days_since_purchase for m in members) / size)
+        centroid = CustomerMetrics(
+            customer_id=f"CLUSTER-{n:03d}",
+            customer_name=f"Cluster {n} ({size} customers)",
+            email="cluster@example.com",
+            total_spend=total_spend.quantize(Decimal("0.01")),
+            order_count=order_count,
+            avg_order_value=(sum(m.avg_order_value for m in members) / size).quantize(Decimal("0.01")),
+            last_purchase_date=datetime.now() - timedelta(days=days_since),
+            days_since_purchase=days_since,
+            purchase_frequency=round(sum(m.purchase_frequency for m in members) / size, 2),
+            language=language,
+        )
+        clusters.append(CustomerCluster(
+            cluster_id=centroid.customer_id,
+            key={"spend_band": spend_band, "recency_band": recency_band,
+                 "frequency_band": frequency_band, "language": language},
+            centroid=centroid,
+            members=members,
+        ))
+    
+    logger.info("Customers clustered", customers=len(customers), clusters=len(clusters))
+    return clusters
+
+
+def render_profile_template(template: str, customer: CustomerMetrics) -> str:
+    """Fill a cluster profile template's {placeholders} with one member's fields"""
+    values = {
+        "customer_name": customer.customer_name,
+        "customer_id": customer.customer_id,
+        "total_spend": f"${customer.total_spend:,.2f}",
+        "order_count": str(customer.order_count),
+        "purchase_frequency": f"{customer.purchase_frequency:.2f}",
+        "days_since_purchase": str(customer.days_since_purchase),
+    }
+    for name in PROFILE_PLACEHOLDERS:
+        template = template.replace("{" + name + "}", values[name])
+    return template
+
+
+def profile_labels(customer: CustomerMetrics) -> dict[str, str]:
+    """Threshold-derived labels of a profile (lifecycle, engagement, churn risk)"""
+    return {
+        "lifecycle": "Active" if customer.days_since_purchase < 30 else "At-Risk",
+        "engagement": "High" if customer.purchase_frequency > 1 else "Moderate",
+        "risk": "Low" if customer.days_since_purchase < 60 else "Medium",
+    }
+
+
+def clustering_report(clusters: list[CustomerCluster]) -> dict[str, Any]:
+    """
+    Cost saved vs. feature spread around centroids (the quality given up).
+    
+    `label_mismatches` counts members whose own profile labels differ from
+    their centroid's - non-zero means the band edges drifted from the
+    profile thresholds.
+    """
+    customers = sum(len(c.members) for c in clusters)
+    spend_dev, recency_dev, frequency_dev = [], [], []
+    label_mismatches = 0
+    for cluster in clusters:
+        centroid = cluster.centroid
+        centroid_labels = profile_labels(centroid)
+        for member in cluster.members:
+            label_mismatches += profile_labels(member) != centroid_labels
+            spend_dev.append(float(abs(member.total_spend - centroid.total_spend) / centroid.total_spend))
+            recency_dev.append(abs(member.days_since_purchase - centroid.days_since_purchase))
+            frequency_dev.append(abs(member.purchase_frequency - centroid.purchase_frequency))
+    
+    def mean(values: list[float]) -> float:
+        return round(sum(values) / len(values), 3) if values else 0.0
+    
+    return {
+        "clusters": len(clusters),
+        "customers": customers,
+        "profile_llm_calls": len(clusters),
+        "profile_llm_calls_saved": customers - len(clusters),
+        "mean_spend_deviation_pct": round(mean(spend_dev) * 100, 1),
+        "mean_recency_deviation_days": mean(recency_dev),
+        "mean_frequency_deviation": mean(frequency_dev),
+        "label_mismatches": label_mismatches,
+    }
+
+
 # ==================================================================================
 # LAYER 3: AI/LLM ANALYSIS WITH LANGCHAIN (Nodes 11-22)
 # ==================================================================================
 
+class ModelLatencyStats:
+    """EWMA latency/error tracking plus a rolling window for tail quantiles"""
+    
+    def __init__(self, alpha: float = 0.2, window: int = 100, error_penalty: float = 10.0):
+        self.alpha = alpha
+        self.error_penalty = error_penalty  # seconds charged per expected failure
+        self.ewma_latency: float | None = None
+        self.ewma_error_rate = 0.0
+        self.calls = 0
+        self.samples: deque[float] = deque(maxlen=window)
+    
+    def record(self, latency: float, error: bool = False, censored: bool = False):
+        """
+        Record one call. Only successful latencies feed the EWMA and the
+        quantile window - a fast failure says nothing about answer latency.
+        Censored samples (hedge losers cancelled mid-flight) are lower
+        bounds: they can only raise the EWMA and stay out of the window.
+        """
+        if not error:
+            if self.ewma_latency is None:
+                self.ewma_latency = latency
+            elif not censored or latency > self.ewma_latency:
+                self.ewma_latency = self.alpha * latency + (1 - self.alpha) * self.ewma_latency
+        if censored:
+            return
+        self.calls += 1
+        self.ewma_error_rate = self.alpha * float(error) + (1 - self.alpha) * self.ewma_error_rate
+        if not error:
+            self.samples.append(latency)
+    
+    def quantile(self, q: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(q * (len(ordered) - 1))]
+    
+    def score(self) -> float:
+        """
+        Expected seconds per call - lower routes first. Errors cost
+        `error_penalty` seconds each (a wasted round trip, RPM budget and a
+        failover), so a model failing fast never outranks a slow healthy one.
+        """
+        return (self.ewma_latency or 0.0) + self.ewma_error_rate * self.error_penalty
+
+
+# USD per 1M tokens (prompt, completion) - keep in sync with provider pricing
+MODEL_PRICING_PER_MTOK = {
+    "claude-sonnet-4-5": (3.00, 15.00),
+    "gpt-5": (1.25, 10.00),
+}
+
+# Provider limits per model - adjust to the account's rate-limit tier
+MODEL_RATE_LIMITS = {
+    "claude-sonnet-4-5": {"tpm": 400_000, "rpm": 1_000},
+    "gpt-5": {"tpm": 500_000, "rpm": 500},
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars/token) when the provider reports no usage"""
+    return max(1, len(text) // 4)
+
+
+class TokenLedger:
+    """Per-run token and cost accounting, aggregated by node and model"""
+    
+    def __init__(self):
+        self.entries: dict[tuple[str, str], dict[str, Any]] = defaultdict(
+            lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+        )
+    
+    def record(self, node: str, model: str, prompt_tokens: int, completion_tokens: int):
+        prompt_price, completion_price = MODEL_PRICING_PER_MTOK.get(model, (0.0, 0.0))
+        entry = self.entries[(node, model)]
+        entry["calls"] += 1
+        entry["prompt_tokens"] += prompt_tokens
+        entry["completion_tokens"] += completion_tokens
+        entry["cost_usd"] += (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+    
+    def snapshot(self) -> dict[str, Any]:
+        """Run totals plus breakdowns by node (per model) and by model"""
+        def blank() -> dict[str, Any]:
+            return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+        
+        def add(target: dict[str, Any], entry: dict[str, Any]):
+            for key, value in entry.items():
+                target[key] += value
+        
+        total = blank()
+        by_node: dict[str, dict[str, Any]] = defaultdict(dict)
+        by_model: dict[str, dict[str, Any]] = defaultdict(blank)
+        for (node, model), entry in self.entries.items():
+            add(total, entry)
+            add(by_model[model], entry)
+            by_node[node][model] = {**entry, "cost_usd": round(entry["cost_usd"], 6)}
+        
+        for entry in [total, *by_model.values()]:
+            entry["cost_usd"] = round(entry["cost_usd"], 6)
+        return {"run": total, "by_node": dict(by_node), "by_model": dict(by_model)}
+
+
+class AdmissionScheduler:
+    """
+    Gates new LLM calls on remaining per-model TPM/RPM budget.
+    
+    Each model has a token bucket and a request bucket refilling at its
+    per-minute limit. A call reserves its estimated tokens (prompt estimate +
+    EWMA of recent completion sizes) before it is sent and settles against
+    the provider-reported usage afterwards. Waiters queue FIFO per model, so
+    calls flow at the provider limit instead of bursting into 429s.
+    """
+    
+    def __init__(self, limits: dict[str, dict[str, int]], default_completion_tokens: int = 500, alpha: float = 0.2):
+        self.limits = limits
+        self.alpha = alpha
+        now = time.monotonic()
+        self.buckets = {
+            name: {"tokens": float(limit["tpm"]), "requests": float(limit["rpm"]), "updated": now}
+            for name, limit in limits.items()
+        }
+        self.completion_ewma = {name: float(default_completion_tokens) for name in limits}
+        self.locks = {name: asyncio.Lock() for name in limits}
+        self.throttled_calls = 0
+        self.throttled_seconds = 0.0
+    
+    def _refill(self, name: str):
+        bucket, limit = self.buckets[name], self.limits[name]
+        now = time.monotonic()
+        elapsed = now - bucket["updated"]
+        bucket["tokens"] = min(limit["tpm"], bucket["tokens"] + elapsed * limit["tpm"] / 60)
+        bucket["requests"] = min(limit["rpm"], bucket["requests"] + elapsed * limit["rpm"] / 60)
+        bucket["updated"] = now
+    
+    async def acquire(self, name: str, prompt_tokens: int) -> int:
+        """Wait for budget and reserve it; returns the reserved token count"""
+        if name not in self.limits:
+            return 0
+        limit = self.limits[name]
+        reserved = min(int(prompt_tokens + self.completion_ewma[name]), limit["tpm"])
+        
+        async with self.locks[name]:
+            throttled = False
+            while True:
+                self._refill(name)
+                bucket = self.buckets[name]
+                if bucket["tokens"] >= reserved and bucket["requests"] >= 1:
+                    bucket["tokens"] -= reserved
+                    bucket["requests"] -= 1
+                    return reserved
+                wait = max(
+                    (reserved - bucket["tokens"]) * 60 / limit["tpm"],
+                    (1 - bucket["requests"]) * 60 / limit["rpm"],
+                )
+                if not throttled:
+                    throttled = True
+                    self.throttled_calls += 1
+                self.throttled_seconds += wait
+                await asyncio.sleep(wait)
+    
+    def settle(self, name: str, reserved: int, prompt_tokens: int, completion_tokens: int, completed: bool = True):
+        """
+        Reconcile a reservation with actual usage (over-use becomes bucket debt).
+        Abandoned calls (cancelled or failed) return their unused reservation
+        but do not feed the completion-size estimate.
+        """
+        if name not in self.limits:
+            return
+        self._refill(name)
+        self.buckets[name]["tokens"] += reserved - (prompt_tokens + completion_tokens)
+        if completed:
+            self.completion_ewma[name] = (
+                self.alpha * completion_tokens + (1 - self.alpha) * self.completion_ewma[name]
+            )
+    
+    def snapshot(self) -> dict[str, Any]:
+        for name in self.limits:
+            self._refill(name)
+        return {
+            "throttled_calls": self.throttled_calls,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "remaining": {
+                name: {"tokens": int(bucket["tokens"]), "requests": int(bucket["requests"])}
+                for name, bucket in self.buckets.items()
+            },
+        }
+
+
+class ModelRouter:
+    """
+    Latency-aware, hedged routing across interchangeable chat models.
+    
+    - Routes each call to the model with the best EWMA latency/error score
+    - If the primary has not answered after its observed p95 latency,
+      sends a hedged request to the next-best model
+    - First successful answer wins, the other request is cancelled
+    - A primary failure fails over to the alternate immediately
+    - Optional AdmissionScheduler gates every request (hedges included)
+      on the model's TPM/RPM budget
+    """
+    
+    def __init__(
+        self,
+        models: dict[str, BaseChatModel],
+        scheduler: AdmissionScheduler | None = None,
+        hedge_quantile: float = 0.95,
+        default_hedge_delay: float = 3.0,
+        min_hedge_delay: float = 0.05,
+        min_samples: int = 10,
+    ):
+        self.models = models
+        self.scheduler = scheduler
+        self.stats = {name: ModelLatencyStats() for name in models}
+        self.hedge_quantile = hedge_quantile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+    
+    def rank(self, preferred: str | None = None) -> list[str]:
+        """Models by observed score; `preferred` only breaks ties (e.g. cold start)"""
+        return sorted(self.models, key=lambda name: (self.stats[name].score(), name != preferred))
+    
+    def hedge_delay(self, name: str) -> float:
+        stats = self.stats[name]
+        if len(stats.samples) < self.min_samples:
+            return self.default_hedge_delay
+        return max(stats.quantile(self.hedge_quantile), self.min_hedge_delay)
+    
+    async def _call(self, name: str, prompt: str, node: str, usage: TokenLedger | None) -> str:
+        """One admitted model call with latency, error and token accounting"""
+        prompt_tokens = estimate_tokens(prompt)
+        reserved = await self.scheduler.acquire(name, prompt_tokens) if self.scheduler else 0
+        
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            message = await self.models[name].ainvoke(prompt)
+        except (asyncio.CancelledError, Exception) as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                # Hedge loser: latency is only a lower bound
+                self.stats[name].record(loop.time() - started, censored=True)
+            else:
+                self.stats[name].record(loop.time() - started, error=True)
+            # The provider still bills the prompt it received
+            if self.scheduler:
+                self.scheduler.settle(name, reserved, prompt_tokens, 0, completed=False)
+            if usage is not None:
+                usage.record(node, name, prompt_tokens, 0)
+            raise
+        self.stats[name].record(loop.time() - started)
+        
+        reported = message.usage_metadata or {}
+        prompt_tokens = reported.get("input_tokens", prompt_tokens)
+        completion_tokens = reported.get("output_tokens", estimate_tokens(str(message.content)))
+        if self.scheduler:
+            self.scheduler.settle(name, reserved, prompt_tokens, completion_tokens)
+        if usage is not None:
+            usage.record(node, name, prompt_tokens, completion_tokens)
+        return message.content
+    
+    async def ainvoke(
+        self,
+        prompt: str,
+        preferred: str | None = None,
+        node: str = "unknown",
+        usage: TokenLedger | None = None,
+    ) -> tuple[str, str]:
+        """
+        Run `prompt` on the best model (hedged), returning (content, model_name).
+        
+        Token usage of every call is recorded in `usage` under `node`;
+        cancelled hedge losers and failed calls count their prompt tokens.
+        """
+        ranked = self.rank(preferred)
+        primary = ranked[0]
+        alternates = ranked[1:2]
+        tasks: dict[asyncio.Task, str] = {}
+        
+        def launch(name: str):
+            tasks[asyncio.create_task(self._call(name, prompt, node, usage))] = name
+        
+        launch(primary)
+        timeout = self.hedge_delay(primary) if alternates else None
+        last_error: BaseException | None = None
+        try:
+            while True:
+                pending = {t for t in tasks if not t.done()}
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                if not done:
+                    # Primary is slower than its p95 - hedge on the alternate
+                    hedge = alternates.pop(0)
+                    launch(hedge)
+                    self.hedges_fired += 1
+                    logger.info("Hedged LLM request", primary=primary, hedge=hedge)
+                    timeout = None
+                    continue
+                
+                for task in done:
+                    name = tasks[task]
+                    if task.exception() is None:
+                        if name != primary:
+                            self.hedge_wins += 1
+                        return task.result(), name
+                    last_error = task.exception()
+                    logger.info("LLM call failed", model=name, error=str(last_error))
+                
+                if alternates:
+                    launch(alternates.pop(0))
+                    timeout = None
+                elif all(t.done() for t in tasks):
+                    raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def snapshot(self) -> dict[str, Any]:
+        """Per-model routing stats for workflow metrics"""
+        return {
+            "hedges_fired": self.hedges_fired,
+            "hedge_wins": self.hedge_wins,
+            "models": {
+                name: {
+                    "calls": stats.calls,
+                    "ewma_latency_s": round(stats.ewma_latency, 4) if stats.ewma_latency is not None else None,
+                    "ewma_error_rate": round(stats.ewma_error_rate, 4),
+                    "p95_latency_s": round(p95, 4) if (p95 := stats.quantile(0.95)) is not None else None,
+                }
+                for name, stats in self.stats.items()
+            },
+            **({"admission": self.scheduler.snapshot()} if self.scheduler else {}),
+        }
+
+
+class FakeLatencyChatModel(BaseChatModel):
+    """
+    Local chat model with injectable latency and error distributions.
+    
+    Stands in for Claude/GPT-5 when exercising ModelRouter without API calls,
+    e.g. `FakeLatencyChatModel(latency=lambda: random.lognormvariate(-1, 0.5))`.
+    """
+    response: str = "Simulated analysis"
+    latency: Callable[[], float] = lambda: 0.0
+    error_rate: float = 0.0
+    
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency-chat"
+    
+    def _result(self, messages) -> ChatResult:
+        if random.random() < self.error_rate:
+            raise RuntimeError("Simulated provider error")
+        input_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+        output_tokens = estimate_tokens(self.response)
+        message = AIMessage(content=self.response, usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency())
+        return self._result(messages)
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency())
+        return self._result(messages)
+
+
+_model_router: ModelRouter | None = None
+
+
+def get_model_router() -> ModelRouter:
+    """Process-wide production router, so latency stats persist across runs"""
+    global _model_router
+    if _model_router is None:
+        _model_router = ModelRouter({
+            "claude-sonnet-4-5": ChatAnthropic(model="claude-sonnet-4-5", temperature=0.7),
+            "gpt-5": ChatOpenAI(model="gpt-5", temperature=0.8),
+        }, scheduler=AdmissionScheduler(MODEL_RATE_LIMITS))
+    return _model_router
+
+
+def classify_segment(customer: CustomerMetrics) -> tuple[str, str]:
+    """Intelligent rule-based segmentation (works in both demo and production)"""
+    if customer.total_spend >= Decimal("50000") and customer.days_since_purchase < 60:
+        return "VIP", "High spend (>$50K) with recent activity - premium customer"
+    elif customer.total_spend >= Decimal("15000") and customer.purchase_frequency > 1.0:
+        return "Growth", "Strong mid-tier customer with increasing purchase frequency"
+    elif customer.days_since_purchase >= 90:
+        return "Churned", "Inactive for 90+ days - requires win-back campaign"
+    elif customer.days_since_purchase >= 60:
+        return "At-Risk", "60-90 days inactive - re-engagement needed"
+    elif customer.order_count <= 2:
+        return "New", "New customer - focus on onboarding and education"
+    else:
+        return "Default", "Standard customer - regular engagement appropriate"
+
+
+# NODE 17: Template library - campaigns may pin one instead of the segment default.
+# Fields are format strings over customer_name, segment and days.
+EMAIL_TEMPLATES: dict[str, dict[str, str]] = {
+    "winback": {
+        "subject": "{customer_name}, we miss you - here's 15% off your next order",
+        "intro": "It has been {days} days since your last order, and we would love to welcome you back.",
+        "cta": "Claim Your Welcome-Back Offer →",
+    },
+    "premium": {
+        "subject": "Early premium access for {customer_name}",
+        "intro": "As one of our most valued partners, you get early access to our premium catalogue.",
+        "cta": "Explore Premium Access →",
+    },
+    "onboarding": {
+        "subject": "Getting started, {customer_name}: your next steps",
+        "intro": "Welcome aboard! Here is how to get the most out of your account.",
+        "cta": "Start Your Onboarding Guide →",
+    },
+}
+
+
 class LangChainOrchestrator:
     """
     Advanced LangChain integration for stateful AI reasoning.
     
     Implements:
     - ConversationBufferMemory for campaign context
-    - LLMChain for multi-step reasoning
+    - PromptTemplate chains for multi-step reasoning
     - Memory persistence in Redis for continuous learning
+    - Hedged, latency-aware routing between Claude and GPT-5 (ModelRouter)
     """
     
-    def __init__(self, demo_mode: bool = True):
+    def __init__(self, demo_mode: bool = True, router: ModelRouter | None = None):
         """
         Initialize LangChain orchestrator.
         
         Args:
             demo_mode: If True, simulates AI responses for portfolio demo.
                       If False, uses real Claude/GPT-5 APIs (requires credentials).
+            router: Model router for production calls. Defaults to the shared
+                    Claude/GPT-5 router; pass one built on FakeLatencyChatModel
+                    to exercise routing locally.
         """
         # NODE 11: Initialize LangChain memory
         self.memory = ConversationBufferMemory(
@@ -375,28 +1229,31 @@ class LangChainOrchestrator:
             return_messages=True
         )
         self.demo_mode = demo_mode
+        self.router = None
+        self.usage = TokenLedger()  # Token/cost accounting for this run
         
         if not demo_mode:
-            # Production: Real AI models via LangChain
-            self.claude = ChatAnthropic(model="claude-sonnet-4-5", temperature=0.7)
-            self.gpt5 = ChatOpenAI(model="gpt-5", temperature=0.8)
+            # Production: Real AI models via LangChain, behind the hedged router
+            self.router = router or get_model_router()
         
         logger.info("LangChain orchestrator initialized", demo_mode=demo_mode)
     
     async def analyze_customer_profile(self, customer: CustomerMetrics) -> str:
         """
         NODE 12: Customer Profile Analyzer
-        Uses Claude Sonnet 4.5 (via LangChain) for deep purchase pattern analysis
+        Uses Claude Sonnet 4.5 (via LangChain) for deep purchase pattern analysis,
+        hedged with GPT-5 and rerouted when Claude is slow or failing
         """
         logger.info("STEPLOG START node12_profile_analyzer")
         
         if self.demo_mode:
             # Demo mode: Generate realistic analysis without API calls
+            labels = profile_labels(customer)
             analysis = f"""Customer {customer.customer_name} shows strong engagement patterns:
 1. Purchase History: {customer.order_count} orders totaling ${customer.total_spend:,.2f}
-2. Lifecycle Stage: {'Active' if customer.days_since_purchase < 30 else 'At-Risk'} customer
-3. Engagement: {'High' if customer.purchase_frequency > 1 else 'Moderate'} frequency ({customer.purchase_frequency:.2f}/month)
-4. Risk: {'Low' if customer.days_since_purchase < 60 else 'Medium'} churn risk"""
+2. Lifecycle Stage: {labels['lifecycle']} customer
+3. Engagement: {labels['engagement']} frequency ({customer.purchase_frequency:.2f}/month)
+4. Risk: {labels['risk']} churn risk"""
             logger.info("Generated demo customer profile", customer_id=customer.customer_id)
             return analysis
         
@@ -416,13 +1273,71 @@ Provide a concise behavioral analysis focusing on:
 Analysis:"""
         )
         
-        chain = LLMChain(llm=self.claude, prompt=prompt, memory=self.memory)
-        result = await asyncio.to_thread(
-            chain.run,
-            customer_data=customer.model_dump_json()
+        customer_data = customer.model_dump_json()
+        result, model_name = await self.router.ainvoke(
+            prompt.format(customer_data=customer_data),
+            preferred="claude-sonnet-4-5",
+            node="node12_profile_analyzer",
+            usage=self.usage
         )
+        self.memory.save_context({"input": customer_data}, {"output": result})
         
-        logger.info("Customer profile analyzed", customer_id=customer.customer_id)
+        logger.info("Customer profile analyzed", customer_id=customer.customer_id, model=model_name)
+        return result
+    
+    async def analyze_cluster_profile(self, cluster: CustomerCluster) -> str:
+        """
+        NODE 12 (clustered): Profile one cluster centroid
+        
+        Returns an analysis template with {placeholders} for customer-specific
+        fields, rendered per member with render_profile_template().
+        """
+        logger.info("STEPLOG START node12_profile_analyzer")
+        centroid = cluster.centroid
+        
+        if self.demo_mode:
+            # Labels come from the centroid - band edges keep them valid for all members
+            labels = profile_labels(centroid)
+            template = f"""Customer {{customer_name}} shows strong engagement patterns:
+1. Purchase History: {{order_count}} orders totaling {{total_spend}}
+2. Lifecycle Stage: {labels['lifecycle']} customer
+3. Engagement: {labels['engagement']} frequency ({{purchase_frequency}}/month)
+4. Risk: {labels['risk']} churn risk"""
+            logger.info("Generated demo cluster profile", cluster_id=cluster.cluster_id, members=len(cluster.members))
+            return template
+        
+        prompt = PromptTemplate(
+            input_variables=["cluster_data", "placeholders"],
+            template="""Analyze the purchase behavior of this customer segment (cluster centroid):
+
+Segment: {cluster_data}
+
+Provide a concise behavioral analysis focusing on:
+1. Purchase patterns and trends
+2. Customer lifecycle stage
+3. Engagement level
+4. Risk factors
+
+Write it about a single customer. Wherever you mention a customer-specific value,
+use these placeholders verbatim instead of the centroid value: {placeholders}
+
+Analysis:"""
+        )
+        
+        cluster_data = cluster.centroid.model_dump_json(exclude={"customer_id", "email"})
+        result, model_name = await self.router.ainvoke(
+            prompt.format(
+                cluster_data=cluster_data,
+                placeholders=", ".join("{" + name + "}" for name in PROFILE_PLACEHOLDERS)
+            ),
+            preferred="claude-sonnet-4-5",
+            node="node12_profile_analyzer",
+            usage=self.usage
+        )
+        self.memory.save_context({"input": cluster_data}, {"output": result})
+        
+        logger.info("Cluster profile analyzed", cluster_id=cluster.cluster_id,
+                    members=len(cluster.members), model=model_name)
         return result
     
     async def segment_customer(self, customer: CustomerMetrics, profile_analysis: str) -> CustomerSegment:
@@ -434,25 +1349,7 @@ Analysis:"""
         """
         logger.info("STEPLOG START node13_segmentation_engine")
         
-        # Intelligent rule-based segmentation (works in both demo and production)
-        if customer.total_spend >= Decimal("50000") and customer.days_since_purchase < 60:
-            segment = "VIP"
-            reasoning = "High spend (>$50K) with recent activity - premium customer"
-        elif customer.total_spend >= Decimal("15000") and customer.purchase_frequency > 1.0:
-            segment = "Growth"
-            reasoning = "Strong mid-tier customer with increasing purchase frequency"
-        elif customer.days_since_purchase >= 90:
-            segment = "Churned"
-            reasoning = "Inactive for 90+ days - requires win-back campaign"
-        elif customer.days_since_purchase >= 60:
-            segment = "At-Risk"
-            reasoning = "60-90 days inactive - re-engagement needed"
-        elif customer.order_count <= 2:
-            segment = "New"
-            reasoning = "New customer - focus on onboarding and education"
-        else:
-            segment = "Default"
-            reasoning = "Standard customer - regular engagement appropriate"
+        segment, reasoning = classify_segment(customer)
         
         logger.info("Customer segmented", segment=segment, customer_id=customer.customer_id)
         
@@ -467,11 +1364,17 @@ Analysis:"""
             ]
         )
     
-    async def generate_email_content(self, customer: CustomerMetrics, segment: CustomerSegment) -> EmailCampaign:
+    async def generate_email_content(
+        self,
+        customer: CustomerMetrics,
+        segment: CustomerSegment,
+        template_id: str | None = None,
+    ) -> EmailCampaign:
         """
         NODES 14-21: Complete Email Generation Pipeline
         
-        Multi-stage AI content generation with LangChain
+        Multi-stage AI content generation with LangChain. `template_id` pins a
+        template from EMAIL_TEMPLATES instead of the segment default.
         """
         logger.info("STEPLOG START node14_opportunity_detector")
         logger.info("STEPLOG START node15_email_copy_generator")
@@ -499,10 +1402,23 @@ Make them personalized, urgent, and segment-appropriate. Return as numbered list
             f"Limited time: Premium access for valued customers like you"
         ]
         
+        # NODE 17: Template selection
+        template = EMAIL_TEMPLATES.get(template_id) if template_id else None
+        if template is None:
+            intro = f"As one of our {segment.segment.lower()} customers, we wanted to reach out with something special."
+            cta = f"View {segment.segment} Recommendations →"
+            template_id = segment.segment.lower()
+        else:
+            fields = {"customer_name": customer.customer_name, "segment": segment.segment,
+                      "days": customer.days_since_purchase}
+            subject_lines.insert(0, template["subject"].format(**fields))
+            intro = template["intro"].format(**fields)
+            cta = template["cta"]
+        
         # NODE 15: Email body generation
         body_template = f"""Dear {customer.customer_name},
 
-As one of our {segment.segment.lower()} customers, we wanted to reach out with something special.
+{intro}
 
 Based on your purchase history (${customer.total_spend:,.2f} total value), we've identified products that complement your previous orders:
 
@@ -521,8 +1437,8 @@ Your Account Team
         return EmailCampaign(
             subject_lines=subject_lines,
             body_text=body_template,
-            cta=f"View {segment.segment} Recommendations →",
-            template_id=f"template_{segment.segment.lower()}",
+            cta=cta,
+            template_id=f"template_{template_id}",
             variant_a=variant_a,
             variant_b=variant_b
         )
@@ -571,6 +1487,30 @@ def route_customer_to_campaign_path(segment: CustomerSegment, customer: Customer
 # LAYER 5: DELIVERY (Nodes 29-32)
 # ==================================================================================
 
+_codewords_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncCodewordsClient] = weakref.WeakKeyDictionary()
+
+
+def get_codewords_client() -> AsyncCodewordsClient:
+    """
+    Shared Codewords client for the running event loop.
+    
+    Building a client (and its httpx connection pool/TLS context) costs ~40ms
+    of CPU, which capped delivery at ~10 sends/s when done per call.
+    """
+    loop = asyncio.get_running_loop()
+    client = _codewords_clients.get(loop)
+    if client is None:
+        client = _codewords_clients[loop] = AsyncCodewordsClient()
+    return client
+
+
+async def close_codewords_client():
+    """Close the running loop's shared client - call before the loop shuts down"""
+    client = _codewords_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
 async def send_via_gmail(customer: CustomerMetrics, campaign: EmailCampaign, actually_send: bool) -> str | None:
     """
     NODE 29: Gmail API - Send Personalized Emails
@@ -585,23 +1525,22 @@ async def send_via_gmail(customer: CustomerMetrics, campaign: EmailCampaign, act
         return f"demo_gmail_id_{hashlib.md5(customer.email.encode()).hexdigest()[:12]}"
     
     # Production delivery via Pipedream Gmail integration
-    async with AsyncCodewordsClient() as client:
-        response = await client.run(
-            service_id="pipedream",
-            inputs={
-                "app": "gmail",
-                "action": "send-email",
-                "props": {
-                    "to": customer.email,
-                    "subject": campaign.variant_a["subject"],
-                    "body": campaign.variant_a["body"],
-                    "bodyType": "plain"
-                }
+    response = await get_codewords_client().run(
+        service_id="pipedream",
+        inputs={
+            "app": "gmail",
+            "action": "send-email",
+            "props": {
+                "to": customer.email,
+                "subject": campaign.variant_a["subject"],
+                "body": campaign.variant_a["body"],
+                "bodyType": "plain"
             }
-        )
-        response.raise_for_status()  # Let errors propagate naturally
-        result = response.json()
-        return result.get("ret", {}).get("id")
+        }
+    )
+    response.raise_for_status()  # Let errors propagate naturally
+    result = response.json()
+    return result.get("ret", {}).get("id")
 
 
 async def log_to_sheets(campaign_result: CampaignResult, actually_log: bool) -> bool:
@@ -617,24 +1556,23 @@ async def log_to_sheets(campaign_result: CampaignResult, actually_log: bool) ->
         return True
     
     # Production logging via Pipedream Sheets integration
-    async with AsyncCodewordsClient() as client:
-        await client.run(
-            service_id="pipedream",
-            inputs={
-                "app": "google_sheets",
-                "action": "add-single-row",
-                "props": {
-                    "sheetId": "DEMO_SHEET_ID",  # Configure with actual Google Sheet ID
-                    "myColumnData": [
-                        campaign_result.customer_id,
-                        campaign_result.email,
-                        campaign_result.segment,
-                        str(campaign_result.sent),
-                        datetime.now().isoformat()
-                    ]
-                }
+    await get_codewords_client().run(
+        service_id="pipedream",
+        inputs={
+            "app": "google_sheets",
+            "action": "add-single-row",
+            "props": {
+                "sheetId": "DEMO_SHEET_ID",  # Configure with actual Google Sheet ID
+                "myColumnData": [
+                    campaign_result.customer_id,
+                    campaign_result.email,
+                    campaign_result.segment,
+                    str(campaign_result.sent),
+                    datetime.now().isoformat()
+                ]
             }
-        )
+        }
+    )
     # Let errors propagate - platform handles them
     return True
 
@@ -696,19 +1634,371 @@ Key learnings: This campaign targeted high-value customers with personalized con
     logger.info("LangChain memory updated with campaign results")
 
 
+# ==================================================================================
+# RESPONSE SERIALIZATION: PROJECTION, PAGINATION & COMPRESSION
+# ==================================================================================
+
+COMPRESSION_MIN_BYTES = 1024  # Below this, compression costs more than it saves
+RUN_RESULTS_CACHE_SIZE = 32  # Recent runs whose campaign results stay pageable
+
+_run_results: OrderedDict[str, list[CampaignResult]] = OrderedDict()
+
+
+def _encode_cursor(run_id: str, offset: int, page_size: int) -> str:
+    return base64.urlsafe_b64encode(f"{run_id}:{offset}:{page_size}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int, int]:
+    """Cursor → (run_id, offset, page_size); 400 on anything we did not issue"""
+    try:
+        run_id, offset, page_size = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        offset, page_size = int(offset), int(page_size)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Malformed cursor") from None
+    if offset < 0 or not 1 <= page_size <= 10000:
+        raise HTTPException(status_code=400, detail="Malformed cursor")
+    return run_id, offset, page_size
+
+
+def store_run_results(results: list[CampaignResult]) -> str:
+    """Keep a run's campaign results for cursor pagination (bounded LRU)"""
+    run_id = uuid.uuid4().hex
+    _run_results[run_id] = results
+    while len(_run_results) > RUN_RESULTS_CACHE_SIZE:
+        _run_results.popitem(last=False)
+    return run_id
+
+
+def paginate_campaign_results(run_id: str, offset: int, page_size: int) -> tuple[list[CampaignResult], str | None]:
+    """Slice one page of a stored run and return it with the cursor of the next page"""
+    results = _run_results.get(run_id)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired run")
+    _run_results.move_to_end(run_id)
+    
+    page = results[offset:offset + page_size]
+    next_offset = offset + page_size
+    next_cursor = _encode_cursor(run_id, next_offset, page_size) if next_offset < len(results) else None
+    return page, next_cursor
+
+
+def _negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick zstd over gzip from an Accept-Encoding header (q=0 means refused)"""
+    accepted = set()
+    for token in accept_encoding.lower().split(","):
+        name, _, params = token.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    if "zstd" in accepted:
+        return "zstd"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def encode_json_response(model: BaseModel, accept_encoding: str = "", include: set[str] | None = None) -> Response:
+    """
+    Fast serialization path for large responses.
+    
+    Serializes straight to JSON bytes with pydantic-core (no re-validation
+    against response_model, no jsonable_encoder dict walk), applies field
+    projection, and compresses with zstd or gzip when the client accepts it.
+    """
+    body = model.model_dump_json(include=include).encode()
+    headers = {"Vary": "Accept-Encoding"}
+    
+    encoding = _negotiate_encoding(accept_encoding) if len(body) >= COMPRESSION_MIN_BYTES else None
+    if encoding == "zstd":
+        body = zstandard.ZstdCompressor(level=3).compress(body)
+        headers["Content-Encoding"] = "zstd"
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def render_workflow_response(response: WorkflowResponse, request: WorkflowRequest, accept_encoding: str) -> Response:
+    """Apply the request's projection and pagination options, then encode"""
+    sections = get_args(ResponseSection) if request.include_sections is None else request.include_sections
+    include = {"execution_summary", "completion"} | set(sections)
+    
+    if request.page_size is not None and "campaign_results" in include:
+        run_id = store_run_results(response.campaign_results)
+        page, next_cursor = paginate_campaign_results(run_id, 0, request.page_size)
+        response = response.model_copy(update={
+            "campaign_results": page,
+            "run_id": run_id,
+            "next_cursor": next_cursor,
+        })
+        include |= {"run_id", "next_cursor"}
+    
+    return encode_json_response(response, accept_encoding, include)
+
+
 # ==================================================================================
 # MAIN WORKFLOW ORCHESTRATION
 # ==================================================================================
 
+# Processing order when time is short: most valuable / most at stake first
+SEGMENT_PRIORITY = {"VIP": 0, "At-Risk": 1, "Growth": 2, "Churned": 3, "New": 4, "Default": 5}
+
+
+def customer_priority(customer: CustomerMetrics) -> tuple[int, Decimal]:
+    """Sort key: segment priority, then highest spend first"""
+    segment, _ = classify_segment(customer)
+    return SEGMENT_PRIORITY[segment], -customer.total_spend
+
+
+class DeadlineBudget:
+    """
+    Tracks a request's time budget.
+    
+    New work is only started when the remaining time covers the expected
+    duration of one more item (EWMA of observed items x safety factor) plus
+    a reserve for analytics and the response, so in-flight work finishes
+    and the caller gets partial results instead of a gateway timeout.
+    """
+    
+    def __init__(self, deadline_ms: int | None, reserve_s: float = 0.05, safety: float = 1.5, alpha: float = 0.3):
+        self.deadline_ms = deadline_ms
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline_ms / 1000 if deadline_ms else None
+        self.reserve_s = reserve_s
+        self.safety = safety
+        self.alpha = alpha
+        self.item_estimate: float | None = None
+    
+    def can_start(self) -> bool:
+        if self.deadline is None:
+            return True
+        remaining = self.deadline - time.monotonic() - self.reserve_s
+        return remaining > (self.item_estimate or 0.0) * self.safety
+    
+    def record_item(self, seconds: float):
+        if self.item_estimate is None:
+            self.item_estimate = seconds
+        else:
+            self.item_estimate = self.alpha * seconds + (1 - self.alpha) * self.item_estimate
+    
+    def elapsed_ms(self) -> int:
+        return int((time.monotonic() - self.started) * 1000)
+
+
+def run_etl(count: int) -> tuple[list[ERPOrder], list[CustomerMetrics], int]:
+    """
+    LAYERS 1-2: Input + ETL, run once per request.
+    
+    The returned CustomerMetrics are shared read-only by every campaign pass.
+    """
+    # LAYER 1: INPUT - Fetch data from ERP and Customer DB
+    logger.info("=== LAYER 1: INPUT ===")
+    erp_orders = generate_mock_erp_orders(count)
+    customer_store = get_customer_store()
+    customers_synced = customer_store.sync(count)
+    
+    # LAYER 2: DATA PROCESSING - ETL Pipeline (Nodes 3-10)
+    logger.info("=== LAYER 2: DATA PROCESSING ===")
+    customer_metrics = process_and_aggregate_orders(erp_orders, customer_store)
+    return erp_orders, customer_metrics, customers_synced
+
+
+def select_campaign_customers(prioritized: list[CustomerMetrics], definition: CampaignDefinition) -> list[CustomerMetrics]:
+    """Customers eligible for a campaign, in priority order (references, not copies)"""
+    return [
+        customer for customer in prioritized
+        if customer.total_spend >= definition.min_total_spend
+        and (definition.include_segments is None or classify_segment(customer)[0] in definition.include_segments)
+    ]
+
+
+class ProfileCache:
+    """
+    Request-scoped customer profiles (NODE 12), computed on first use.
+    
+    With clusters, the first member reached profiles its whole cluster (one
+    LLM call, rendered per member). Profiling therefore happens inside the
+    per-customer work items: it follows priority order, is timed into the
+    deadline estimate, and never runs ahead of delivery.
+    """
+    
+    def __init__(self, orchestrator: LangChainOrchestrator, clusters: list[CustomerCluster] | None = None):
+        self.orchestrator = orchestrator
+        self.clusters = clusters
+        self.profiles: dict[str, str] = {}
+        self.cluster_of = {member.customer_id: cluster for cluster in clusters or [] for member in cluster.members}
+        self.clusters_profiled = 0
+    
+    async def get(self, customer: CustomerMetrics) -> str:
+        profile = self.profiles.get(customer.customer_id)
+        if profile is not None:
+            return profile
+        
+        cluster = self.cluster_of.get(customer.customer_id)
+        if cluster is None:
+            profile = self.profiles[customer.customer_id] = await self.orchestrator.analyze_customer_profile(customer)
+            return profile
+        
+        template = await self.orchestrator.analyze_cluster_profile(cluster)
+        self.clusters_profiled += 1
+        for member in cluster.members:
+            self.profiles[member.customer_id] = render_profile_template(template, member)
+        return self.profiles[customer.customer_id]
+    
+    def clustering_metrics(self) -> dict[str, Any] | None:
+        if self.clusters is None:
+            return None
+        return {**clustering_report(self.clusters), "clusters_profiled": self.clusters_profiled}
+
+
+async def run_campaign_item(
+    customer: CustomerMetrics,
+    definition: CampaignDefinition,
+    orchestrator: LangChainOrchestrator,
+    profiles: ProfileCache,
+) -> tuple[CampaignResult, CustomerSegment, EmailCampaign, str]:
+    """LAYERS 3-5 for one (campaign, customer) work item"""
+    # NODE 12: Profile analysis (NODE 10b cluster profile on the first member reached)
+    profile = await profiles.get(customer)
+    
+    # NODE 13: Segmentation
+    segment = await orchestrator.segment_customer(customer, profile)
+    
+    # NODES 14-21: Email generation
+    campaign = await orchestrator.generate_email_content(customer, segment, definition.template_id)
+    
+    # LAYER 4: CONDITIONAL ROUTING (Nodes 23-28)
+    campaign_path = definition.route_overrides.get(segment.segment) or route_customer_to_campaign_path(segment, customer)
+    logger.info("Customer routed", campaign=definition.name, path=campaign_path, segment=segment.segment)
+    
+    # LAYER 5: DELIVERY (Nodes 29-32)
+    logger.info("STEPLOG START node30_log_to_crm")
+    logger.info("STEPLOG START node32_slack_notification")
+    gmail_id = await send_via_gmail(customer, campaign, definition.enable_email)
+    
+    result = CampaignResult(
+        customer_id=customer.customer_id,
+        email=customer.email,
+        segment=segment.segment,
+        sent=gmail_id is not None,
+        gmail_id=gmail_id,
+        crm_logged=definition.enable_crm,
+    )
+    
+    # Log to Sheets
+    if definition.enable_email:
+        result.crm_logged = await log_to_sheets(result, True)
+    
+    return result, segment, campaign, campaign_path
+
+
+async def run_campaigns(
+    prioritized: list[CustomerMetrics],
+    definitions: list[CampaignDefinition],
+    orchestrator: LangChainOrchestrator,
+    budget: DeadlineBudget,
+    profiles: ProfileCache,
+) -> list[CampaignReport]:
+    """
+    LAYERS 3-6 for every campaign over the shared, priority-ordered customers.
+    
+    (campaign, customer) work items run in one global customer_priority
+    order, so under a deadline every campaign's VIPs go before any
+    campaign's Default customers. Profiles come from the request's
+    ProfileCache, so customers targeted by several campaigns are only
+    analyzed once per request.
+    """
+    plans = []
+    for definition in definitions:
+        eligible = select_campaign_customers(prioritized, definition)
+        plans.append((definition, eligible, eligible[:definition.max_customers]))
+        logger.info("Campaign planned", campaign=definition.name, eligible=len(eligible),
+                    selected=len(plans[-1][2]))
+    
+    # Position in `prioritized` is the global priority rank; campaign order breaks ties
+    rank = {customer.customer_id: n for n, customer in enumerate(prioritized)}
+    work = sorted(
+        ((rank[customer.customer_id], index, customer)
+         for index, (_, _, selected) in enumerate(plans) for customer in selected),
+        key=lambda item: item[:2],
+    )
+    
+    campaign_results: list[list[CampaignResult]] = [[] for _ in plans]
+    routing_paths: list[dict[str, int]] = [defaultdict(int) for _ in plans]
+    sample_previews: list[dict[str, Any]] = [{} for _ in plans]
+    
+    for done, (_, index, customer) in enumerate(work):
+        if not budget.can_start():
+            logger.info("Deadline reached - returning partial results", completed=done, planned=len(work))
+            break
+        item_started = time.monotonic()
+        
+        result, segment, campaign, campaign_path = await run_campaign_item(
+            customer, plans[index][0], orchestrator, profiles
+        )
+        campaign_results[index].append(result)
+        routing_paths[index][campaign_path] += 1
+        
+        # Capture first result for preview
+        if not sample_previews[index]:
+            sample_previews[index] = {
+                "customer": customer.model_dump(),
+                "segment": segment.model_dump(),
+                "campaign": campaign.model_dump(),
+                "routing_path": campaign_path
+            }
+        
+        budget.record_item(time.monotonic() - item_started)
+    
+    # LAYER 6: ANALYTICS & OPTIMIZATION (Nodes 33-39)
+    logger.info("=== LAYER 6: ANALYTICS & OPTIMIZATION ===")
+    reports = []
+    for (definition, eligible, selected), results, paths, preview in zip(plans, campaign_results, routing_paths, sample_previews):
+        partial = len(results) < len(selected)
+        completed_ids = {r.customer_id for r in results}
+        reports.append(CampaignReport(
+            name=definition.name,
+            analytics=calculate_campaign_analytics(results, eligible),
+            campaign_results=results,
+            routing_paths=dict(paths),
+            completion=CompletionInfo(
+                status="partial" if partial else "complete",
+                customers_planned=len(selected),
+                customers_completed=len(results),
+                skipped_customer_ids=[c.customer_id for c in selected if c.customer_id not in completed_ids],
+                stopped_reason="deadline" if partial else None,
+                deadline_ms=budget.deadline_ms,
+                elapsed_ms=budget.elapsed_ms(),
+            ),
+            sample_preview=preview,
+        ))
+    return reports
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_codewords_client()
+
+
 app = FastAPI(
     title="Enterprise ERP Intelligence → Email Marketing",
     description="39-Node AI-Powered Marketing Automation with LangChain",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
-@app.post("/", response_model=WorkflowResponse)
-async def execute_marketing_workflow(request: WorkflowRequest):
+@app.post(
+    "/",
+    response_model=None,
+    responses={200: {
+        "model": WorkflowResponse,
+        "description": "Full result; with include_sections only the listed sections (plus execution_summary and completion) are present",
+    }},
+)
+async def execute_marketing_workflow(request: WorkflowRequest, http_request: Request):
     """
     🚀 Execute Enterprise ERP-to-Email Marketing Workflow
     
@@ -728,25 +2018,30 @@ async def execute_marketing_workflow(request: WorkflowRequest):
     
     **LangChain Features:**
     - ConversationBufferMemory for campaign context
-    - LLMChain for multi-step reasoning
+    - PromptTemplate chains for multi-step reasoning
     - Redis-backed memory persistence
+    
+    **Request Options:**
+    - deadline_ms: time budget - priority order (VIP, At-Risk, then by spend)
+      and partial campaign_results with completion metadata
+    - cluster_profiles: one AI profile per customer cluster (templated per member)
+    - include_sections: field projection ([] → execution_summary and completion only)
+    - page_size: cursor pagination of campaign_results
+    - gzip/zstd compression negotiated from Accept-Encoding
     """
-    logger.info("Starting enterprise marketing workflow", mode=request.mode)
+    logger.info("Starting enterprise marketing workflow", mode=request.mode, deadline_ms=request.deadline_ms)
+    budget = DeadlineBudget(request.deadline_ms)
     
     # Determine customer count
     count = 5 if request.mode == "test_sample" else request.customer_count
     
-    # LAYER 1: INPUT - Fetch data from ERP and Customer DB
-    logger.info("=== LAYER 1: INPUT ===")
-    erp_orders = generate_mock_erp_orders(count)
-    customer_db = generate_mock_customer_database(count)
+    # LAYERS 1-2: Input + ETL
+    erp_orders, customer_metrics, customers_synced = run_etl(count)
     
-    # LAYER 2: DATA PROCESSING - ETL Pipeline (Nodes 3-10)
-    logger.info("=== LAYER 2: DATA PROCESSING ===")
-    customer_metrics = process_and_aggregate_orders(erp_orders, customer_db)
+    accept_encoding = http_request.headers.get("accept-encoding", "")
     
     if not customer_metrics:
-        return WorkflowResponse(
+        empty_response = WorkflowResponse(
             execution_summary="No high-value customers found (>$10K annual spend)",
             workflow_metrics={"customers_analyzed": count, "high_value_found": 0},
             campaign_results=[],
@@ -755,63 +2050,29 @@ async def execute_marketing_workflow(request: WorkflowRequest):
                 high_value_count=0, estimated_roi="0%"
             ),
             langchain_memory={},
-            sample_preview={}
+            sample_preview={},
+            completion=CompletionInfo(
+                status="complete", customers_planned=0, customers_completed=0,
+                deadline_ms=request.deadline_ms, elapsed_ms=budget.elapsed_ms()
+            )
         )
+        return render_workflow_response(empty_response, request, accept_encoding)
     
     # LAYER 3: AI ANALYSIS with LangChain (Nodes 11-22)
     logger.info("=== LAYER 3: AI ANALYSIS (LangChain) ===")
     logger.info("STEPLOG START node11_langchain_memory_init")
     orchestrator = LangChainOrchestrator()
+    definition = CampaignDefinition(enable_email=request.enable_email, enable_crm=request.enable_crm)
     
-    campaign_results = []
-    sample_preview = None
+    # Highest-priority customers first, so a deadline cuts the least valuable work
+    prioritized = sorted(customer_metrics, key=customer_priority)
+    clusters = cluster_customers(prioritized[:definition.max_customers]) if request.cluster_profiles else None
+    profiles = ProfileCache(orchestrator, clusters)
     
-    for idx, customer in enumerate(customer_metrics[:min(10, len(customer_metrics))]):
-        # NODE 12: Profile analysis
-        profile = await orchestrator.analyze_customer_profile(customer)
-        
-        # NODE 13: Segmentation
-        segment = await orchestrator.segment_customer(customer, profile)
-        
-        # NODES 14-21: Email generation
-        campaign = await orchestrator.generate_email_content(customer, segment)
-        
-        # LAYER 4: CONDITIONAL ROUTING (Nodes 23-28)
-        campaign_path = route_customer_to_campaign_path(segment, customer)
-        logger.info("Customer routed", path=campaign_path, segment=segment.segment)
-        
-        # LAYER 5: DELIVERY (Nodes 29-32)
-        logger.info("STEPLOG START node30_log_to_crm")
-        logger.info("STEPLOG START node32_slack_notification")
-        gmail_id = await send_via_gmail(customer, campaign, request.enable_email)
-        
-        result = CampaignResult(
-            customer_id=customer.customer_id,
-            email=customer.email,
-            segment=segment.segment,
-            sent=gmail_id is not None,
-            gmail_id=gmail_id,
-            crm_logged=request.enable_crm,
-        )
-        
-        # Log to Sheets
-        if request.enable_email:
-            result.crm_logged = await log_to_sheets(result, True)
-        
-        campaign_results.append(result)
-        
-        # Capture first result for preview
-        if idx == 0:
-            sample_preview = {
-                "customer": customer.model_dump(),
-                "segment": segment.model_dump(),
-                "campaign": campaign.model_dump(),
-                "routing_path": campaign_path
-            }
-    
-    # LAYER 6: ANALYTICS & OPTIMIZATION (Nodes 33-39)
-    logger.info("=== LAYER 6: ANALYTICS & OPTIMIZATION ===")
-    analytics = calculate_campaign_analytics(campaign_results, customer_metrics)
+    # LAYERS 3-6: Analysis, routing, delivery and analytics
+    report, = await run_campaigns(prioritized, [definition], orchestrator, budget, profiles)
+    clustering = profiles.clustering_metrics()
+    campaign_results, analytics, completion = report.campaign_results, report.analytics, report.completion
     
     # NODE 38: Update LangChain memory
     await update_langchain_memory(orchestrator, analytics)
@@ -823,19 +2084,126 @@ async def execute_marketing_workflow(request: WorkflowRequest):
     # Extract memory snapshot
     memory_vars = orchestrator.memory.load_memory_variables({})
     
-    return WorkflowResponse(
-        execution_summary=f"Processed {len(customer_metrics)} high-value customers across {len(set(r.segment for r in campaign_results))} segments. Estimated ROI: {analytics.estimated_roi}",
+    partial_note = (
+        f" Partial: {completion.customers_completed}/{completion.customers_planned} campaigns before the deadline."
+        if completion.status == "partial" else ""
+    )
+    
+    response = WorkflowResponse(
+        execution_summary=f"Processed {len(customer_metrics)} high-value customers across {len(set(r.segment for r in campaign_results))} segments. Estimated ROI: {analytics.estimated_roi}{partial_note}",
         workflow_metrics={
             "total_orders_analyzed": len(erp_orders),
             "high_value_customers_found": len(customer_metrics),
             "campaigns_generated": len(campaign_results),
             "delivery_success_rate": f"{sum(1 for r in campaign_results if r.sent) / len(campaign_results) * 100:.1f}%" if campaign_results else "0%",
             "langchain_memory_entries": len(memory_vars.get("campaign_history", [])),
+            "customer_store_delta_synced": customers_synced,
+            "token_usage": orchestrator.usage.snapshot(),
+            **({"clustering": clustering} if clustering else {}),
+            **({"model_router": orchestrator.router.snapshot()} if orchestrator.router else {}),
         },
         campaign_results=campaign_results,
         analytics=analytics,
         langchain_memory=memory_vars,
-        sample_preview=sample_preview or {}
+        sample_preview=report.sample_preview,
+        completion=completion
+    )
+    return render_workflow_response(response, request, accept_encoding)
+
+
+@app.post(
+    "/multi_campaign",
+    response_model=None,
+    responses={200: {"model": MultiCampaignResponse, "description": "Shared ETL metrics and one report per campaign"}},
+)
+async def execute_multi_campaign(request: MultiCampaignRequest, http_request: Request):
+    """
+    🔀 Run N Campaign Variants over One Shared ETL Pass
+    
+    Layers 1-2 (ERP fetch, customer sync, aggregation) run once. Every
+    campaign definition then applies its own selection, routing, email
+    template and delivery settings to the same read-only CustomerMetrics,
+    returning per-campaign analytics.
+    
+    Work items of all campaigns run in one global priority order, so a
+    deadline cuts the least valuable (campaign, customer) pairs first.
+    Customer profiles are shared across campaigns, so a customer targeted by
+    several variants costs one analysis: one ETL + N cheap passes.
+    """
+    logger.info("Starting multi-campaign workflow", mode=request.mode, campaigns=len(request.campaigns))
+    budget = DeadlineBudget(request.deadline_ms)
+    count = 5 if request.mode == "test_sample" else request.customer_count
+    
+    # LAYERS 1-2: Input + ETL, once for all campaigns
+    erp_orders, customer_metrics, customers_synced = run_etl(count)
+    etl_ms = budget.elapsed_ms()
+    
+    logger.info("=== LAYER 3: AI ANALYSIS (LangChain) ===")
+    logger.info("STEPLOG START node11_langchain_memory_init")
+    orchestrator = LangChainOrchestrator()
+    prioritized = sorted(customer_metrics, key=customer_priority)
+    
+    clusters = None
+    if request.cluster_profiles:
+        # Cluster the union of every campaign's targets once
+        targeted: dict[str, CustomerMetrics] = {}
+        for definition in request.campaigns:
+            for customer in select_campaign_customers(prioritized, definition)[:definition.max_customers]:
+                targeted[customer.customer_id] = customer
+        clusters = cluster_customers(sorted(targeted.values(), key=customer_priority))
+    profiles = ProfileCache(orchestrator, clusters)
+    
+    reports = await run_campaigns(prioritized, request.campaigns, orchestrator, budget, profiles)
+    for report in reports:
+        await update_langchain_memory(orchestrator, report.analytics)
+    
+    logger.info("STEPLOG START node39_generate_weekly_report")
+    logger.info("Multi-campaign execution complete", campaigns=len(reports))
+    
+    total_results = sum(len(r.campaign_results) for r in reports)
+    partial = [r.name for r in reports if r.completion.status == "partial"]
+    response = MultiCampaignResponse(
+        execution_summary=(
+            f"Ran {len(reports)} campaigns over {len(customer_metrics)} high-value customers from one ETL pass "
+            f"({total_results} campaign results)."
+            + (f" Partial before the deadline: {', '.join(partial)}." if partial else "")
+        ),
+        workflow_metrics={
+            "total_orders_analyzed": len(erp_orders),
+            "high_value_customers_found": len(customer_metrics),
+            "campaigns_run": len(reports),
+            "campaign_results_total": total_results,
+            "profiles_analyzed": len(profiles.profiles),
+            "etl_ms": etl_ms,
+            "downstream_ms": budget.elapsed_ms() - etl_ms,
+            "customer_store_delta_synced": customers_synced,
+            "token_usage": orchestrator.usage.snapshot(),
+            **({"clustering": clustering} if (clustering := profiles.clustering_metrics()) else {}),
+            **({"model_router": orchestrator.router.snapshot()} if orchestrator.router else {}),
+        },
+        campaigns=reports,
+    )
+    return encode_json_response(response, http_request.headers.get("accept-encoding", ""))
+
+
+@app.get("/campaign_results", response_model=CampaignResultsPage)
+async def get_campaign_results_page(
+    http_request: Request,
+    cursor: str,
+    page_size: int | None = Query(default=None, ge=1, le=10000),
+):
+    """
+    📄 Fetch the next page of a run's campaign results
+    
+    Pass the `next_cursor` returned by `POST /` (with `page_size` set) or by
+    a previous page. Pages keep the size of the first page unless
+    `page_size` is given. Cursors expire once the run drops out of the cache.
+    """
+    run_id, offset, cursor_page_size = _decode_cursor(cursor)
+    page, next_cursor = paginate_campaign_results(run_id, offset, page_size or cursor_page_size)
+    return encode_json_response(
+        CampaignResultsPage(run_id=run_id, campaign_results=page, next_cursor=next_cursor),
+        http_request.headers.get("accept-encoding", ""),
     )
 
 
@@ -0,0 +1,186 @@
+# /// script
+# requires-python = "==3.11.*"
+# dependencies = [
+#   "codewords-client==0.4.0",
+#   "fastapi==0.116.1",
+#   "pydantic==2.10.5",
+# ]
+# ///
+
+"""
+🧪 LOCAL CODEWORDS RUNTIME STAND-IN (Pipedream Gmail + Sheets)
+
+Emulates the Codewords `POST /run/{service_id}` endpoint for the Pipedream
+actions used by the delivery layer, so `send_via_gmail` / `log_to_sheets`
+can be load-tested through the real AsyncCodewordsClient without touching
+live Gmail or Sheets.
+
+Emulated actions:
+✓ pipedream / gmail / send-email          → {"ret": {"id", "threadId", "labelIds"}}
+✓ pipedream / google_sheets / add-single-row → {"ret": {"updatedRange", "updatedRows"}}
+
+Configurable behaviour (CLI flags or env vars):
+- Latency: lognormal around a median (--latency-ms, --latency-sigma)
+- Error rate: random 500s (--error-rate)
+- Rate limits: per-app requests/minute, 429 + Retry-After (--rate-limit-rpm)
+
+Usage:
+  uv run fake_codewords_service.py --port 8765 --latency-ms 40 --error-rate 0.01
+  CODEWORDS_RUNTIME_URI=http://127.0.0.1:8765 CODEWORDS_API_KEY=fake ...
+"""
+
+from typing import Any
+import argparse
+import asyncio
+import math
+import os
+import random
+import time
+import uuid
+
+from codewords_client import logger, run_service
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+
+class FakeRuntimeConfig(BaseModel):
+    """Latency, failure and throttling behaviour of the stand-in"""
+    latency_ms: float = Field(default=float(os.environ.get("FAKE_LATENCY_MS", 50)), ge=0)
+    latency_sigma: float = Field(default=float(os.environ.get("FAKE_LATENCY_SIGMA", 0.5)), ge=0)
+    error_rate: float = Field(default=float(os.environ.get("FAKE_ERROR_RATE", 0.0)), ge=0, le=1)
+    rate_limit_rpm: int = Field(default=int(os.environ.get("FAKE_RATE_LIMIT_RPM", 0)), ge=0)
+
+
+config = FakeRuntimeConfig()
+stats: dict[str, int] = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0}
+_buckets: dict[str, dict[str, float]] = {}
+_sheet_rows: dict[str, int] = {}
+
+
+def _sample_latency() -> float:
+    """Lognormal latency in seconds with the configured median"""
+    if config.latency_ms <= 0:
+        return 0.0
+    return random.lognormvariate(math.log(config.latency_ms / 1000), config.latency_sigma)
+
+
+def _take_rate_token(app_name: str) -> float | None:
+    """Consume one request from the app's bucket; returns Retry-After seconds if empty"""
+    if config.rate_limit_rpm <= 0:
+        return None
+    now = time.monotonic()
+    bucket = _buckets.setdefault(app_name, {"tokens": float(config.rate_limit_rpm), "updated": now})
+    refill_per_s = config.rate_limit_rpm / 60
+    bucket["tokens"] = min(config.rate_limit_rpm, bucket["tokens"] + (now - bucket["updated"]) * refill_per_s)
+    bucket["updated"] = now
+    if bucket["tokens"] >= 1:
+        bucket["tokens"] -= 1
+        return None
+    return (1 - bucket["tokens"]) / refill_per_s
+
+
+def gmail_send_email(props: dict[str, Any]) -> dict[str, Any]:
+    """Shape of the Pipedream gmail/send-email action result"""
+    if not props.get("to"):
+        raise HTTPException(status_code=400, detail="props.to is required")
+    message_id = uuid.uuid4().hex[:16]
+    return {"id": message_id, "threadId": message_id, "labelIds": ["SENT"]}
+
+
+def sheets_add_single_row(props: dict[str, Any]) -> dict[str, Any]:
+    """Shape of the Pipedream google_sheets/add-single-row action result"""
+    sheet_id = props.get("sheetId")
+    columns = props.get("myColumnData") or []
+    if not sheet_id:
+        raise HTTPException(status_code=400, detail="props.sheetId is required")
+    row = _sheet_rows[sheet_id] = _sheet_rows.get(sheet_id, 1) + 1
+    last_col = chr(ord("A") + max(len(columns), 1) - 1)
+    return {
+        "spreadsheetId": sheet_id,
+        "updatedRange": f"Sheet1!A{row}:{last_col}{row}",
+        "updatedRows": 1,
+        "updatedColumns": len(columns),
+    }
+
+
+ACTIONS = {
+    ("gmail", "send-email"): gmail_send_email,
+    ("google_sheets", "add-single-row"): sheets_add_single_row,
+}
+
+
+app = FastAPI(
+    title="Fake Codewords Runtime (Pipedream Gmail + Sheets)",
+    description="Local stand-in for delivery load testing",
+    version="1.0.0",
+)
+
+
+@app.post("/run/{service_id}")
+@app.post("/run/{service_id}/{path:path}")
+async def run(service_id: str, inputs: dict[str, Any], path: str = "", authorization: str | None = Header(default=None)):
+    """Emulated `POST /run/{service_id}` - dispatches Pipedream app actions"""
+    stats["requests"] += 1
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Missing Authorization header")
+    if service_id != "pipedream":
+        raise HTTPException(status_code=404, detail=f"Service {service_id} not emulated")
+
+    app_name, action = inputs.get("app"), inputs.get("action")
+    handler = ACTIONS.get((app_name, action))
+    if handler is None:
+        raise HTTPException(status_code=404, detail=f"Action {app_name}/{action} not emulated")
+
+    retry_after = _take_rate_token(app_name)
+    if retry_after is not None:
+        stats["throttled"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Rate limit exceeded"},
+            headers={"Retry-After": f"{retry_after:.3f}"},
+        )
+
+    await asyncio.sleep(_sample_latency())
+
+    if random.random() < config.error_rate:
+        stats["errors"] += 1
+        return JSONResponse(status_code=500, content={"detail": "Simulated upstream failure"})
+
+    stats["ok"] += 1
+    return {"ret": handler(inputs.get("props") or {})}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "config": config.model_dump()}
+
+
+@app.get("/stats")
+async def get_stats():
+    """Request counters since startup"""
+    return stats
+
+
+def main():
+    global config
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8765)))
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms)
+    parser.add_argument("--latency-sigma", type=float, default=config.latency_sigma)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--rate-limit-rpm", type=int, default=config.rate_limit_rpm)
+    args = parser.parse_args()
+
+    config = FakeRuntimeConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rpm=args.rate_limit_rpm,
+    )
+    logger.info("Starting fake Codewords runtime", port=args.port, **config.model_dump())
+    run_service(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# /// script
+# requires-python = "==3.11.*"
+# dependencies = [
+#   "codewords-client==0.4.0",
+#   "fastapi==0.116.1",
+#   "pydantic==2.10.5",
+#   "email-validator==2.2.0",
+#   "langchain==0.3.20",
+#   "langchain-anthropic==0.3.10",
+#   "langchain-openai==0.2.14",
+#   "httpx==0.28.1",
+#   "zstandard==0.23.0",
+# ]
+# ///
+
+"""
+📬 Delivery layer load test
+
+Pushes thousands of sends through the real delivery code path
+(`send_via_gmail` + `log_to_sheets` → AsyncCodewordsClient → HTTP) against
+the bundled fake Codewords runtime, and reports throughput, latency
+percentiles and failures per action.
+
+By default the fake runtime is started as a subprocess; pass --runtime-uri
+to target one that is already running.
+
+Usage:
+  uv run load_test_delivery.py --sends 5000 --concurrency 100 --latency-ms 40 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+
+# The Codewords client reads these at construction - point it at the fake
+os.environ.setdefault("CODEWORDS_API_KEY", "fake-load-test-key")
+
+from erp_intelligence_email_marketing import (
+    CampaignResult,
+    CustomerMetrics,
+    EmailCampaign,
+    close_codewords_client,
+    log_to_sheets,
+    send_via_gmail,
+)
+
+FAKE_SERVICE = Path(__file__).with_name("fake_codewords_service.py")
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def build_send(i: int) -> tuple[CustomerMetrics, EmailCampaign]:
+    """Synthetic customer + campaign shaped like a production send"""
+    customer = CustomerMetrics(
+        customer_id=f"CUST-{i:05d}",
+        customer_name=f"Customer {i+1} Corp",
+        email=f"customer{i+1}@techcorp.com",
+        total_spend=Decimal("25000.00"),
+        order_count=6,
+        avg_order_value=Decimal("4166.67"),
+        last_purchase_date=datetime.now(),
+        days_since_purchase=12,
+        purchase_frequency=1.5,
+    )
+    body = f"Dear {customer.customer_name},\n\nWe truly value your business.\n"
+    campaign = EmailCampaign(
+        subject_lines=[f"Exclusive offer for {customer.customer_name}"],
+        body_text=body,
+        cta="View Recommendations →",
+        template_id="template_growth",
+        variant_a={"subject": f"Exclusive offer for {customer.customer_name}", "body": body},
+        variant_b={"subject": f"Exclusive offer for {customer.customer_name}", "body": body},
+    )
+    return customer, campaign
+
+
+async def run_load(sends: int, concurrency: int) -> dict[str, dict]:
+    """Deliver `sends` emails (send + sheets log each) with bounded concurrency"""
+    latencies: dict[str, list[float]] = {"gmail": [], "sheets": []}
+    failures: dict[str, Counter] = {"gmail": Counter(), "sheets": Counter()}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(action: str, coro):
+        started = time.perf_counter()
+        try:
+            result = await coro
+        except httpx.HTTPStatusError as exc:
+            failures[action][str(exc.response.status_code)] += 1
+            return None
+        except httpx.HTTPError as exc:
+            failures[action][type(exc).__name__] += 1
+            return None
+        latencies[action].append(time.perf_counter() - started)
+        return result
+
+    async def deliver(i: int):
+        customer, campaign = build_send(i)
+        async with semaphore:
+            gmail_id = await timed("gmail", send_via_gmail(customer, campaign, actually_send=True))
+            if gmail_id is None:
+                return
+            result = CampaignResult(
+                customer_id=customer.customer_id, email=customer.email,
+                segment="Growth", sent=True, gmail_id=gmail_id,
+            )
+            await timed("sheets", log_to_sheets(result, actually_log=True))
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(deliver(i) for i in range(sends)))
+    finally:
+        await close_codewords_client()
+    elapsed = time.perf_counter() - started
+
+    report = {}
+    for action, samples in latencies.items():
+        report[action] = {
+            "ok": len(samples),
+            "failed": dict(failures[action]),
+            "throughput_per_s": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+            "max_ms": round(max(samples, default=0.0) * 1000, 1),
+        }
+    report["total"] = {"sends": sends, "concurrency": concurrency, "elapsed_s": round(elapsed, 2)}
+    return report
+
+
+def start_fake_runtime(args) -> subprocess.Popen:
+    """Launch the fake runtime and wait until /health answers"""
+    process = subprocess.Popen([
+        sys.executable, str(FAKE_SERVICE),
+        "--port", str(args.port),
+        "--latency-ms", str(args.latency_ms),
+        "--latency-sigma", str(args.latency_sigma),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rpm", str(args.rate_limit_rpm),
+    ])
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/health", timeout=0.5).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Fake Codewords runtime did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delivery layer load test against the fake Codewords runtime")
+    parser.add_argument("--sends", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--runtime-uri", default=None, help="Use an already running runtime instead of spawning one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rpm", type=int, default=0)
+    args = parser.parse_args()
+
+    process = None
+    if args.runtime_uri is None:
+        process = start_fake_runtime(args)
+        args.runtime_uri = f"http://127.0.0.1:{args.port}"
+    os.environ["CODEWORDS_RUNTIME_URI"] = args.runtime_uri
+
+    try:
+        report = asyncio.run(run_load(args.sends, args.concurrency))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    total = report.pop("total")
+    print(f"{total['sends']:,} sends @ concurrency {total['concurrency']} in {total['elapsed_s']}s ({args.runtime_uri})")
+    print(f"{'action':<8}{'ok':>8}{'per s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  failed")
+    for action, row in report.items():
+        print(
+            f"{action:<8}{row['ok']:>8}{row['throughput_per_s']:>9}{row['p50_ms']:>9}"
+            f"{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}  {row['failed'] or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
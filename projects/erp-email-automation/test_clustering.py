@@ -0,0 +1,80 @@
+"""
+Cluster-level profiling must give every member the profile labels it
+would get when profiled individually.
+
+Run: python -m pytest test_clustering.py
+"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from erp_intelligence_email_marketing import (
+    CustomerMetrics,
+    LangChainOrchestrator,
+    cluster_customers,
+    clustering_report,
+    profile_labels,
+    render_profile_template,
+)
+
+
+def customer(i: int, spend: str, days: int, frequency: float, orders: int = 6) -> CustomerMetrics:
+    return CustomerMetrics(
+        customer_id=f"CUST-{i:05d}",
+        customer_name=f"Customer {i} Corp",
+        email=f"customer{i}@techcorp.com",
+        total_spend=Decimal(spend),
+        order_count=orders,
+        avg_order_value=(Decimal(spend) / orders).quantize(Decimal("0.01")),
+        last_purchase_date=datetime.now() - timedelta(days=days),
+        days_since_purchase=days,
+        purchase_frequency=frequency,
+    )
+
+
+@pytest.mark.parametrize("edge_frequency, other_frequency", [(1.0, 0.8), (1.0, 1.8)])
+def test_frequency_edge_keeps_its_individual_label(edge_frequency, other_frequency):
+    members = [customer(1, "20000", 20, edge_frequency), customer(2, "20000", 20, other_frequency)]
+    clusters = cluster_customers(members)
+
+    assert clustering_report(clusters)["label_mismatches"] == 0
+    for cluster in clusters:
+        for member in cluster.members:
+            assert profile_labels(member) == profile_labels(cluster.centroid)
+
+
+@pytest.mark.parametrize("days", [29, 30, 59, 60, 89, 90])
+def test_recency_edges_keep_individual_labels(days):
+    clusters = cluster_customers([customer(1, "20000", days, 0.8), customer(2, "20000", days + 1, 0.8)])
+
+    assert clustering_report(clusters)["label_mismatches"] == 0
+
+
+def test_rendered_cluster_profiles_match_individual_profiles():
+    rng = random.Random(7)
+    members = [
+        customer(
+            i,
+            f"{rng.choice([10000, 15000, 24999.99, 25000, 49999.99, 50000, 100000]) + rng.random() * 5000:.2f}",
+            rng.choice([0, 29, 30, 31, 59, 60, 61, 89, 90, 120]),
+            rng.choice([0.2, 0.5, 0.99, 1.0, 1.01, 1.8, 2.0, 3.0]),
+            orders=rng.randint(1, 12),
+        )
+        for i in range(300)
+    ]
+    orchestrator = LangChainOrchestrator(demo_mode=True)
+
+    async def run() -> int:
+        mismatches = 0
+        for cluster in cluster_customers(members):
+            template = await orchestrator.analyze_cluster_profile(cluster)
+            for member in cluster.members:
+                individual = await orchestrator.analyze_customer_profile(member)
+                mismatches += render_profile_template(template, member) != individual
+        return mismatches
+
+    assert asyncio.run(run()) == 0
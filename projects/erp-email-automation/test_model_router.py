@@ -0,0 +1,156 @@
+"""
+ModelRouter behaviour against FakeLatencyChatModel: hedging, cancelling
+the losing request, failover and latency-based re-routing.
+
+Run: python -m pytest test_model_router.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from erp_intelligence_email_marketing import (
+    AdmissionScheduler,
+    FakeLatencyChatModel,
+    ModelLatencyStats,
+    ModelRouter,
+    TokenLedger,
+)
+
+
+def fake(seconds: float, response: str = "ok", error_rate: float = 0.0) -> FakeLatencyChatModel:
+    return FakeLatencyChatModel(response=response, latency=lambda: seconds, error_rate=error_rate)
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    router = ModelRouter(
+        {"primary": fake(1.0, "slow"), "alternate": fake(0.01, "fast")},
+        default_hedge_delay=0.05,
+    )
+
+    started = time.monotonic()
+    content, model = asyncio.run(router.ainvoke("prompt", preferred="primary"))
+    elapsed = time.monotonic() - started
+
+    assert (content, model) == ("fast", "alternate")
+    assert elapsed < 0.5
+    assert router.hedges_fired == 1
+    assert router.hedge_wins == 1
+    # The loser was cancelled mid-flight: censored latency, no completed call
+    assert router.stats["primary"].calls == 0
+    assert router.stats["primary"].ewma_latency >= 0.05
+    assert router.stats["alternate"].calls == 1
+
+
+def test_fast_primary_is_not_hedged():
+    router = ModelRouter(
+        {"primary": fake(0.01, "fast"), "alternate": fake(0.01, "other")},
+        default_hedge_delay=0.5,
+    )
+
+    assert asyncio.run(router.ainvoke("prompt", preferred="primary")) == ("fast", "primary")
+    assert router.hedges_fired == 0
+    assert router.stats["alternate"].ewma_latency is None
+
+
+def test_primary_failure_fails_over_without_waiting_for_hedge_delay():
+    router = ModelRouter(
+        {"primary": fake(0.0, error_rate=1.0), "alternate": fake(0.01, "fallback")},
+        default_hedge_delay=5.0,
+    )
+
+    started = time.monotonic()
+    assert asyncio.run(router.ainvoke("prompt", preferred="primary")) == ("fallback", "alternate")
+    assert time.monotonic() - started < 1.0
+    assert router.hedges_fired == 0
+    assert router.stats["primary"].ewma_error_rate > 0
+
+
+def test_all_models_failing_raises_last_error():
+    router = ModelRouter(
+        {"primary": fake(0.0, error_rate=1.0), "alternate": fake(0.0, error_rate=1.0)},
+    )
+
+    with pytest.raises(RuntimeError, match="Simulated provider error"):
+        asyncio.run(router.ainvoke("prompt", preferred="primary"))
+
+
+def test_routes_to_the_faster_model_once_observed():
+    router = ModelRouter(
+        {"slow": fake(0.05, "slow"), "fast": fake(0.001, "fast")},
+        default_hedge_delay=5.0,
+    )
+
+    async def run() -> list[str]:
+        return [(await router.ainvoke("prompt", preferred="slow"))[1] for _ in range(4)]
+
+    # Cold start honours the preference, then observed latency takes over
+    assert asyncio.run(run()) == ["slow", "fast", "fast", "fast"]
+    assert router.rank(preferred="slow") == ["fast", "slow"]
+
+
+def test_completed_calls_are_recorded_in_the_ledger():
+    router = ModelRouter({"primary": fake(0.0, "x" * 40), "alternate": fake(0.0)})
+    usage = TokenLedger()
+
+    asyncio.run(router.ainvoke("p" * 400, preferred="primary", node="node12", usage=usage))
+
+    entry = usage.snapshot()["by_node"]["node12"]["primary"]
+    assert entry["calls"] == 1
+    assert entry["completion_tokens"] == 10
+
+
+def test_cancelled_and_failed_calls_bill_their_prompt():
+    scheduler = AdmissionScheduler({name: {"tpm": 100_000, "rpm": 100} for name in ("primary", "alternate")})
+    router = ModelRouter(
+        {"primary": fake(1.0), "alternate": fake(0.01)},
+        scheduler=scheduler,
+        default_hedge_delay=0.05,
+    )
+    usage = TokenLedger()
+
+    asyncio.run(router.ainvoke("p" * 400, preferred="primary", node="node12", usage=usage))
+
+    cancelled = usage.snapshot()["by_node"]["node12"]["primary"]
+    assert (cancelled["calls"], cancelled["prompt_tokens"], cancelled["completion_tokens"]) == (1, 100, 0)
+    assert usage.snapshot()["run"]["calls"] == 2
+    # Reservations settled: only the tokens actually used are gone
+    remaining = scheduler.snapshot()["remaining"]
+    assert remaining["primary"]["tokens"] >= 100_000 - 101
+    assert scheduler.completion_ewma["primary"] == 500
+
+    # A failed call is billed the same way before failing over
+    router.models["primary"] = fake(0.0, error_rate=1.0)
+    router.stats["primary"].ewma_latency = None
+    asyncio.run(router.ainvoke("p" * 400, preferred="primary", node="node13", usage=usage))
+    assert usage.snapshot()["by_node"]["node13"]["primary"]["prompt_tokens"] == 100
+
+
+def test_model_failing_fast_stops_being_primary():
+    router = ModelRouter(
+        {"down": fake(0.02, error_rate=1.0), "healthy": fake(0.3, "ok")},
+        default_hedge_delay=5.0,
+    )
+
+    async def run() -> list[str]:
+        return [(await router.ainvoke("prompt", preferred="down"))[1] for _ in range(5)]
+
+    assert asyncio.run(run()) == ["healthy"] * 5
+    # Tried once as primary, then routed around
+    assert router.stats["down"].calls == 1
+    assert router.stats["down"].ewma_latency is None
+    assert router.rank(preferred="down") == ["healthy", "down"]
+
+
+def test_censored_samples_only_raise_the_ewma():
+    stats = ModelLatencyStats(alpha=0.5)
+    stats.record(1.0)
+
+    stats.record(0.1, censored=True)
+    assert stats.ewma_latency == 1.0
+
+    stats.record(3.0, censored=True)
+    assert stats.ewma_latency == 2.0
+    assert stats.calls == 1
+    assert list(stats.samples) == [1.0]